@@ -7,7 +7,81 @@
 
 
 import writeToFile
+from symbolTable import SymbolTable
 import sys
+import os
+import glob
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from types import MappingProxyType
+
+
+# Opcode tables are built once when the module is imported and shared
+# by every Assembler. They are read-only so a program can never change them.
+
+# C instructions begin with 111.
+C_PREFIX = 0b111 << 13
+
+# comp -> a-bit and comp bits, already shifted into place.
+COMP_TABLE = MappingProxyType({
+    comp: (("M" in comp) << 12) | (int(bits, 2) << 6)
+    for comp, bits in {
+        # Start of comp a=0
+        "0": "101010",
+        "1": "111111",
+        "-1": "111010",
+        "D": "001100",
+        "A": "110000",
+        "!D": "001101",
+        "!A": "110001",
+        "-D": "001111",
+        "-A": "110011",
+        "D+1": "011111",
+        "A+1": "110111",
+        "D-1": "001110",
+        "A-1": "110010",
+        "D+A": "000010",
+        "D-A": "010011",
+        "A-D": "000111",
+        "D&A": "000000",
+        "D|A": "010101",
+        # Start of comp a=1
+        "M": "110000",
+        "!M": "110001",
+        "-M": "110011",
+        "M+1": "110111",
+        "M-1": "110010",
+        "D+M": "000010",
+        "D-M": "010011",
+        "M-D": "000111",
+        "D&M": "000000",
+        "D|M": "010101",
+    }.items()
+})
+
+# dest -> dest bits, already shifted into place.
+DEST_TABLE = MappingProxyType({
+    "nullDest": 0b000 << 3, # Value is not stored
+    "M": 0b001 << 3,
+    "D": 0b010 << 3,
+    "MD": 0b011 << 3,
+    "A": 0b100 << 3,
+    "AM": 0b101 << 3,
+    "AD": 0b110 << 3,
+    "AMD": 0b111 << 3,
+})
+
+# jump -> jump bits.
+JUMP_TABLE = MappingProxyType({
+    "nullJump": 0b000,
+    "JGT": 0b001,
+    "JEQ": 0b010,
+    "JGE": 0b011,
+    "JLT": 0b100,
+    "JNE": 0b101,
+    "JLE": 0b110,
+    "JMP": 0b111,
+})
 
 
 class Assembler:
@@ -15,101 +89,34 @@ class Assembler:
     def __init__(self):
         """
         Initializes the assembler with:
-            cur_var_address: [int] - start memory address for new variables
-            null_dest: [str] - place in the symbol table for null destinations.
-            null_jump: [str] - place in the symbol table for null jumps.
-            symbol_table [dict] - keeps track of symbols.
+            null_dest: [str] - place in DEST_TABLE for null destinations.
+            null_jump: [str] - place in JUMP_TABLE for null jumps.
+            symbol_table [SymbolTable] - keeps track of the symbols of the
+                program being translated.
         """
-        self.cur_var_address = 16
         self.null_dest = "nullDest"
         self.null_jump = "nullJump"
-        self.symbol_table = {
-            "SP": 0,
-            "LCL": 1,
-            "ARG": 2,
-            "THIS": 3,
-            "THAT": 4,
-            "R0": 0,
-            "R1": 1,
-            "R2": 2,
-            "R3": 3,
-            "R4": 4,
-            "R5": 5,
-            "R6": 6,
-            "R7": 7,
-            "R8": 8,
-            "R9": 9,
-            "R10": 10,
-            "R11": 11,
-            "R12": 12,
-            "R13": 13,
-            "R14": 14,
-            "R15": 15,
-            "SCREEN": 16384,
-            "KBD": 24576, 
-            # Start of comp a=0
-            "0": "101010",
-            "1": "111111",
-            "-1": "111010",
-            "D": "001100",
-            "A": "110000",
-            "!D": "001101",
-            "!A": "110001",
-            "-D": "001111",
-            "-A": "110011",
-            "D+1": "011111",
-            "A+1": "110111",
-            "D-1": "001110",
-            "A-1": "110010",
-            "D+A": "000010",
-            "D-A": "010011",
-            "A-D": "010011",
-            "D&A": "000000",
-            "D|A": "010101",
-            # Start of comp= a=1
-            "M": "110000",
-            "!M": "110001",
-            "-M": "110011",
-            "M+1": "110111",
-            "M-1": "110010",
-            "D+M": "000010",
-            "D-M": "010011",
-            "M-D": "000111",
-            "D&M": "000000",
-            "D|M": "010101",
-            # Start of dest
-            "dnullDest": "000", # Value is not stored
-            "dM": "001",
-            "dD": "010", 
-            "dMD": "011",
-            "dA": "100",
-            "dAM": "101",
-            "dAD": "110",
-            "dAMD": "111",
-            # Start of jump
-            "nullJump": "000",
-            "JGT": "001",
-            "JEQ": "010",
-            "JGE": "011",
-            "JLT": "100",
-            "JNE": "101",
-            "JLE": "110",
-            "JMP": "111"
-        }
+        self.symbol_table = SymbolTable()
 
 
-    def translate(self, contents):
+    def translate(self, contents, single_pass=False):
         """
         Translates code to binary.
 
         Inputs:
 
             contents: list[str] - a list of the lines of code.
+            single_pass: bool - whether to assemble in a single pass,
+                backpatching forward label references at the end.
 
         Returns:
 
-            Returns the translated code in binary.
+            Returns the translated code as a list of 16-bit integers.
         """
+        # Every program gets its own symbols.
+        self.symbol_table = SymbolTable()
+        if single_pass:
+            return self._singlePass(contents)
         binary_lines = []
         contents = self._firstPass(contents)
         line_number = 0
@@ -138,18 +145,61 @@ class Assembler:
 
             The lines of code with the labels removed.
         """
-        i = 0
-        while i < len(contents):
-            line = contents[i]
+        instructions = []
+        for line in contents:
             if line[0] == "(":
                 # Add label to the symbol table and continue. 
-                # Do not increment line number.
-                # Increment current variable address
-                self._addLabelToSymbolTable(line, i)
-                contents.pop(i)
+                # The label points at the next instruction.
+                self._addLabelToSymbolTable(line, len(instructions))
                 continue
-            i += 1
-        return contents
+            instructions.append(line)
+        return instructions
+
+
+    def _singlePass(self, contents):
+        """
+        Translates code to binary in a single pass. Instructions are emitted
+        as they are read. A instructions that use a symbol which is not yet
+        known are recorded as forward references and backpatched once every
+        label has been seen. Symbols that never turn out to be labels are
+        allocated as variables in the order they first appeared, which gives
+        the same addresses as the two pass translation.
+
+        Inputs:
+
+            contents: iterable[str] - the lines of code.
+
+        Returns:
+
+            Returns the translated code as a list of 16-bit integers.
+        """
+        binary_lines = []
+        # Symbol -> list of instruction indexes waiting for its address.
+        forward_refs = {}
+        for line in contents:
+            first_char = line[0]
+            if first_char == "(":
+                self._addLabelToSymbolTable(line, len(binary_lines))
+                continue
+            if first_char == "@":
+                a = line[1:]
+                if not a.isdigit() and a not in self.symbol_table:
+                    # Leave a placeholder and patch it at the end.
+                    forward_refs.setdefault(a, []).append(len(binary_lines))
+                    binary_lines.append(None)
+                    continue
+                line = self._translateA(line)
+            else:
+                line = self._translateC(line)
+            binary_lines.append(line)
+
+        # Backpatch forward references. Dicts keep insertion order, so
+        # variables are allocated in order of first use.
+        for symbol, indexes in forward_refs.items():
+            binary = self._translateA(f"@{symbol}")
+            for index in indexes:
+                binary_lines[index] = binary
+        return binary_lines
 
 
     def _addLabelToSymbolTable(self, line, line_number):
@@ -163,7 +213,7 @@ class Assembler:
         """
         # Remove enclosing parenthesis
         label = line[1:len(line)-1]
-        self.symbol_table[label] = line_number
+        self.symbol_table.addLabel(label, line_number)
         return 
 
 
@@ -177,28 +227,18 @@ class Assembler:
 
         Returns:
 
-            Returns the binary A instruction.
+            Returns the A instruction as an integer.
         """
-        # Remove the leading "@" symbol and convert to binary
+        # Remove the leading "@" symbol.
         a = line[1:]
         if a.isdigit():
-            # If the A instruction is a digit, convert to binary.
-            a = f"{int(a):016b}"
-        elif not a.isdigit():
-            # If the A instruction is a symbol, get from symbol table
-            # or add it to the symbol table with the correct address.
-            if a in self.symbol_table.keys():
-                a = self.symbol_table[a]
-                if type(a) == int:
-                    a = f"{int(a):016b}"
-            else:
-                self.symbol_table[a] = self.cur_var_address
-                self.cur_var_address += 1
-                a = self.symbol_table[a]
-                if type(a) == int:
-                    a = f"{int(a):016b}"
-
-        return a
+            return int(a)
+        # If the A instruction is a symbol, get it from the symbol table
+        # or add it to the symbol table with the correct address.
+        address = self.symbol_table.get(a)
+        if address is None:
+            address = self.symbol_table.addVariable(a)
+        return address
 
 
     def _translateC(self, line):
@@ -211,11 +251,8 @@ class Assembler:
 
         Returns:
 
-            Returns the binary C instruction.
+            Returns the C instruction as an integer.
         """
-        # C instructions begin with 111.
-        c = "111"
-
         # Find the destination.
         if "=" in line:
             equal_index = line.index("=")
@@ -234,18 +271,9 @@ class Assembler:
             comp = assignment
             jump = self.null_jump
 
-        # Set a-bit
-        if "M" in comp:
-            c += "1"
-        else:
-            c += "0"
-
-        # Translate dest, comp and jump into binary
-        c += self._translateComp(comp)
-        c += self._translateDest(dest)
-        c += self._translateJump(jump)
-
-        return c
+        # Combine the prefix, comp (including the a-bit), dest and jump.
+        return (C_PREFIX | self._translateComp(comp)
+                | self._translateDest(dest) | self._translateJump(jump))
 
 
     def _translateDest(self, dest):
@@ -258,9 +286,9 @@ class Assembler:
 
         Returns:
 
-            Returns the binary destination of a C instruction.
+            Returns the dest bits of a C instruction.
         """
-        return self.symbol_table[f"d{dest}"]
+        return DEST_TABLE[dest]
 
 
     def _translateJump(self, jump):
@@ -273,9 +301,9 @@ class Assembler:
 
         Returns:
 
-            Returns the binary jump of a C instruction.
+            Returns the jump bits of a C instruction.
         """
-        return self.symbol_table[jump]
+        return JUMP_TABLE[jump]
 
 
     def _translateComp(self, comp):
@@ -288,17 +316,121 @@ class Assembler:
 
         Returns:
 
-            Returns the binary computation of a C instruction.
+            Returns the a-bit and comp bits of a C instruction.
         """
-        return self.symbol_table[comp]
+        return COMP_TABLE[comp]
+
+
+def assembleFile(input_path, single_pass=False, binary=False):
+    """
+    Assembles one ".asm" file and writes its ".hack" file (and ".bin" file
+    when binary is set) next to it.
+
+    Inputs:
+
+        input_path: str - a file path with the extension .asm
+        single_pass: bool - whether to assemble in a single pass.
+        binary: bool - whether to also write packed 16-bit words.
+
+    Returns:
+
+        Returns the input path, the number of instructions and the
+        number of seconds it took.
+    """
+    start = time.perf_counter()
+    if single_pass:
+        # A single pass can read the file lazily.
+        contents = (line for _, line in writeToFile.streamAsm(input_path))
+    else:
+        contents = writeToFile.parseAsm(input_path)
+    assembler = Assembler()
+    words = assembler.translate(contents, single_pass=single_pass)
+    writeToFile.outHack(input_path, words)
+    if binary:
+        writeToFile.outBinary(input_path, words)
+    return input_path, len(words), time.perf_counter() - start
+
+
+def assembleBatch(input_paths, single_pass=False, binary=False, jobs=None):
+    """
+    Assembles many ".asm" files in a pool of worker processes and prints
+    the timing of each file followed by a summary.
+
+    Inputs:
+
+        input_paths: list[str] - file paths with the extension .asm
+        single_pass: bool - whether to assemble in a single pass.
+        binary: bool - whether to also write packed 16-bit words.
+        jobs: int - number of worker processes, defaults to the CPU count.
+
+    Returns:
+
+        Returns the number of files that failed to assemble.
+    """
+    start = time.perf_counter()
+    failed = 0
+    total_words = 0
+    total_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(assembleFile, path, single_pass, binary): path
+            for path in input_paths
+        }
+        for future in as_completed(futures):
+            try:
+                path, num_words, seconds = future.result()
+            except Exception as error:
+                failed += 1
+                print(f"FAILED {futures[future]}: {error!r}")
+                continue
+            total_words += num_words
+            total_seconds += seconds
+            print(f"{path}: {num_words} instructions in {seconds * 1000:.1f} ms")
+    wall_seconds = time.perf_counter() - start
+    print(
+        f"Assembled {len(input_paths) - failed}/{len(input_paths)} files, "
+        f"{total_words} instructions, {total_seconds:.2f} s of work in "
+        f"{wall_seconds:.2f} s"
+    )
+    return failed
+
+
+def _findAsmFiles(input_path):
+    """
+    Finds the ".asm" files a user inputed directory or glob refers to.
+
+    Inputs:
+
+        input_path: str - a directory or a glob pattern.
+
+    Returns:
+
+        Returns the sorted list of matching ".asm" files.
+    """
+    if os.path.isdir(input_path):
+        input_path = os.path.join(input_path, "*.asm")
+    return sorted(
+        path for path in glob.glob(input_path, recursive=True)
+        if path.endswith(".asm") and os.path.isfile(path)
+    )
 
 
 def main():
     """
     Handles user inputed file paths for translating into binary.
     If not path is given, defaults to a pre-assigned path.
+    Pass --single-pass to assemble without a separate label pass and
+    --binary to also write packed 16-bit words to a ".bin" file.
+    A directory or glob pattern assembles every ".asm" file it matches
+    in a pool of worker processes, --jobs=N sets the number of workers.
     """
-    args = sys.argv
+    single_pass = "--single-pass" in sys.argv
+    binary = "--binary" in sys.argv
+    jobs = None
+    for arg in sys.argv:
+        if arg.startswith("--jobs="):
+            jobs = int(arg[len("--jobs="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
     default_path = "src/asmAndHackFiles/PongL.asm"
     # Determine user inputed file path or default file path.
     if len(args) < 2:
@@ -306,12 +438,18 @@ def main():
         input_path = default_path
     else:
         input_path = args[1]
-    contents = writeToFile.parseAsm(input_path)
-    # Initialize assembler and translate code.
-    assembler = Assembler()
-    binary_lines = assembler.translate(contents)
-    writeToFile.outToFolder(input_path, binary_lines)
+    if os.path.isdir(input_path) or glob.has_magic(input_path):
+        input_paths = _findAsmFiles(input_path)
+        if not input_paths:
+            print(f"No .asm files found in {input_path}")
+            sys.exit(1)
+        if assembleBatch(input_paths, single_pass, binary, jobs):
+            sys.exit(1)
+        return
+    assembleFile(input_path, single_pass, binary)
     print(f"{input_path[:-3]}hack created")
+    if binary:
+        print(f"{input_path[:-3]}bin created")
     return 
 
 
@@ -0,0 +1,132 @@
+# Keep track of the symbols of a Hack assembly program.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: symbolTable.py
+# Date: 10/18/2026
+
+
+from types import MappingProxyType
+
+
+# Symbols every Hack program starts with.
+PREDEFINED_SYMBOLS = MappingProxyType({
+    "SP": 0,
+    "LCL": 1,
+    "ARG": 2,
+    "THIS": 3,
+    "THAT": 4,
+    "R0": 0,
+    "R1": 1,
+    "R2": 2,
+    "R3": 3,
+    "R4": 4,
+    "R5": 5,
+    "R6": 6,
+    "R7": 7,
+    "R8": 8,
+    "R9": 9,
+    "R10": 10,
+    "R11": 11,
+    "R12": 12,
+    "R13": 13,
+    "R14": 14,
+    "R15": 15,
+    "SCREEN": 16384,
+    "KBD": 24576
+})
+
+# Start memory address for new variables.
+VARIABLE_BASE_ADDRESS = 16
+
+
+class SymbolTable:
+
+
+    def __init__(self):
+        """
+        Initializes the symbol table of a single program with:
+            cur_var_address: [int] - memory address of the next variable.
+            symbols: [dict] - symbol -> address, starting with the
+                predefined symbols.
+            labels: [set] - symbols that were defined as labels.
+        """
+        self.cur_var_address = VARIABLE_BASE_ADDRESS
+        self.symbols = dict(PREDEFINED_SYMBOLS)
+        self.labels = set()
+        # Bound for fast lookups in the assembler's inner loop.
+        self.get = self.symbols.get
+
+
+    def __contains__(self, symbol):
+        return symbol in self.symbols
+
+
+    def __getitem__(self, symbol):
+        return self.symbols[symbol]
+
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+    def addLabel(self, label, address):
+        """
+        Adds a label to the symbol table.
+
+        Inputs:
+
+            label: str - the label without its enclosing parenthesis.
+            address: int - the ROM address of the instruction after the label.
+        """
+        self.symbols[label] = address
+        self.labels.add(label)
+        return
+
+
+    def addVariable(self, symbol):
+        """
+        Adds a variable to the symbol table at the next free RAM address.
+
+        Inputs:
+
+            symbol: str - the variable name.
+
+        Returns:
+
+            Returns the address of the variable.
+        """
+        address = self.cur_var_address
+        self.symbols[symbol] = address
+        self.cur_var_address += 1
+        return address
+
+
+    def snapshot(self):
+        """
+        Takes a read-only copy of the symbol table.
+
+        Returns:
+
+            Returns a mapping of symbol -> address that does not change
+            when more symbols are added.
+        """
+        return MappingProxyType(dict(self.symbols))
+
+
+    def export(self):
+        """
+        Exports the symbols defined by the program, ordered by address.
+
+        Returns:
+
+            Returns a list of "symbol kind address" lines where kind is
+            "label" or "var". Predefined symbols are left out.
+        """
+        lines = []
+        for symbol, address in sorted(self.symbols.items(), key=lambda item: item[1]):
+            if symbol in PREDEFINED_SYMBOLS:
+                continue
+            kind = "label" if symbol in self.labels else "var"
+            lines.append(f"{symbol} {kind} {address}")
+        return lines
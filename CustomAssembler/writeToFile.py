@@ -7,6 +7,14 @@
 
 
 import sys
+import os
+from array import array
+from contextlib import contextmanager
+from itertools import islice
+
+
+# Size of the write buffer used for output files.
+BUFFER_SIZE = 1 << 16
 
 
 def parseAsm(input_path):
@@ -22,19 +30,25 @@ def parseAsm(input_path):
         Creates a list of the contents of the input_path with 
         the leading white space and comments removed.
     """
-    input_file_contents = []
     # Open file and clean its contents.
-    with open(input_path, 'r') as file:
-        lines = file.readlines()
-        input_file_contents = cleanLines(lines)
-    
-    # Check if there is a new line at the end of the file and remove it.
-    last_line = input_file_contents[-1]
-    input_file_contents[-1] = last_line.rstrip('\n')
+    return [line for _, line in streamAsm(input_path)]
+
 
-    # Write updated content to the output path.
-    #input_file_contents = ''.join(input_file_contents)
-    return input_file_contents
+def streamAsm(input_path):
+    """
+    Takes in a user inputed file path with a ".asm" file extension and lazily
+    yields the lines in the file striped of leading white space and
+    comments. Only one line of the file is held in memory at a time.
+
+    Input:
+        input_path [str] - A file path with the extension .asm
+
+    Output:
+        Yields (line_number, line) pairs where line_number is the 1-based
+        line of the file the cleaned line came from.
+    """
+    with open(input_path, 'r') as file:
+        yield from iterCleanLines(file)
 
 
 def outToFolder(output_path, contents):
@@ -44,7 +58,7 @@ def outToFolder(output_path, contents):
 
     Input:
         output_path [str] - A file path with the extension .asm
-        contents [list] - List of the contents to output to the file
+        contents [iterable] - Lines of the contents to output to the file
 
     Output:
         Creates a file with the contents of the contents in the path 
@@ -53,9 +67,98 @@ def outToFolder(output_path, contents):
     # Set input and output file paths
     # but with the ".hack" extension
     output_path = output_path[:-4] + ".hack"
-    output_file = open(output_path, "w")
-    contents = '\n'.join(contents)
-    output_file.write(contents)
+    writeLines(output_path, contents)
+
+
+def outHack(output_path, words):
+    """
+    Takes in a user inputed file path with a ".asm" file extension and 
+    creates a file in the same directory with the ".hack" extension
+    holding each word as a line of 16 '0'/'1' characters.
+
+    Input:
+        output_path [str] - A file path with the extension .asm
+        words [list] - List of 16-bit integer instructions
+
+    Output:
+        Creates a textual ".hack" file in the path provided by output_path
+    """
+    outToFolder(output_path, (f"{word:016b}" for word in words))
+
+
+def outBinary(output_path, words):
+    """
+    Takes in a user inputed file path with a ".asm" file extension and 
+    creates a file in the same directory with the ".bin" extension
+    holding each word as a raw little-endian 16-bit value.
+
+    Input:
+        output_path [str] - A file path with the extension .asm
+        words [list] - List of 16-bit integer instructions
+
+    Output:
+        Creates a packed binary file in the path provided by output_path
+    """
+    output_path = output_path[:-4] + ".bin"
+    packed = array("H", words)
+    if sys.byteorder != "little":
+        packed.byteswap()
+    with atomicOpen(output_path, "wb") as output_file:
+        packed.tofile(output_file)
+
+
+def writeLines(output_path, lines, chunk_size=1024):
+    """
+    Writes lines of text to output_path separated by new lines. The lines
+    are written a chunk at a time through a buffered file so the whole
+    output is never joined into one string. See atomicOpen.
+
+    Input:
+        output_path [str] - The file path to write
+        lines [iterable] - The lines to write, e.g. a generator
+        chunk_size [int] - Number of lines joined per write
+
+    Output:
+        Creates or replaces the file at output_path
+    """
+    lines = iter(lines)
+    with atomicOpen(output_path, "w") as output_file:
+        first_line = next(lines, None)
+        if first_line is None:
+            return
+        output_file.write(first_line)
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            output_file.write("\n")
+            output_file.write("\n".join(chunk))
+
+
+@contextmanager
+def atomicOpen(output_path, mode="w"):
+    """
+    Opens a temporary file next to output_path and renames it to
+    output_path once the block finishes. If anything fails the temporary
+    file is removed and output_path is left as it was, so a crashed build
+    never leaves a half-written file.
+
+    Input:
+        output_path [str] - The file path to write
+        mode [str] - "w" for text or "wb" for binary
+
+    Output:
+        Yields the open temporary file
+    """
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode, buffering=BUFFER_SIZE) as output_file:
+            yield output_file
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
 
 def cleanLines(lines):
@@ -70,61 +173,66 @@ def cleanLines(lines):
 
         Returns code with out whitespace or comments.
     """
-    clean_lines = []
-
-    i = 0
-    # Loop through each line of code and remove comments and whitespace.
-    while i < len(lines):
-        line = lines[i]
-        line = cleanFileLine(line)
-
-        comment_index = line.find("//")
-        if comment_index != -1:
-            line = line[:comment_index]
-        line = cleanFileLine(line)
-
-        # Remove multiline comment if it is on a single line.
-        # E.g. code... /* ... comments ... */
-        if "/*" in line and "*/" in line:
-            begin_index = line.index("/*")
-            end_index = line.index("*/")
-            begin_line = line[0:begin_index]
-            end_line = line[end_index+2:]
-            line = begin_line + end_line
-
-        line = cleanFileLine(line)
-
-        if line is None or line == "":
-            i += 1
-            continue
-        clean_lines.append(line)
-
-        # Remove lines of code if it is in a multiline comment.
-        if "/*" in line:
-            comment_index = line.index("/*")
-            line = line[:comment_index]
-            line = cleanFileLine(line)
-            cleanFileLine(line)
-            i += 1
-            while "*/" not in line and i < len(lines):
-                i += 1     
-        i += 1
-    return clean_lines
-                
-
-def cleanFileLine(line):
-    """
-    Removes whitespace and new lines from a line of code.
+    return [line for _, line in iterCleanLines(lines)]
+
+
+def iterCleanLines(lines):
+    """
+    Removes comments and whitespace from lines of code one line at a time.
+    Handles "//" comments as well as "/* ... */" comments that start and
+    end on the same line or span several lines.
 
     Inputs:
 
-        line: str - The line of code.
+        lines: iterable[str] - the lines of code, e.g. an open file.
 
     Returns:
 
-        Returns line of code with whitespace and newlines removed.
+        Yields (line_number, line) pairs for every line that still has
+        code once comments and whitespace are removed. Line numbers start
+        at 1 and refer to the original lines.
+    """
+    in_comment = False
+    for line_number, line in enumerate(lines, 1):
+        if in_comment:
+            # Skip lines until the multiline comment is closed.
+            end_index = line.find("*/")
+            if end_index == -1:
+                continue
+            line = line[end_index+2:]
+            in_comment = False
+
+        # Most lines have no comments at all.
+        if "/" in line:
+            line, in_comment = _removeComments(line)
+
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def _removeComments(line):
     """
+    Removes the comments from a single line of code.
 
-    line = line.strip()
-    line = line.replace("/n", "")
-    return line
\ No newline at end of file
+    Inputs:
+
+        line: str - The line of code.
+
+    Returns:
+
+        Returns the line without comments and whether it opens a
+        multiline comment that is not closed on this line.
+    """
+    while True:
+        line_comment = line.find("//")
+        block_comment = line.find("/*")
+        if block_comment == -1 or (line_comment != -1 and line_comment < block_comment):
+            if line_comment != -1:
+                line = line[:line_comment]
+            return line, False
+        end_index = line.find("*/", block_comment+2)
+        if end_index == -1:
+            return line[:block_comment], True
+        # E.g. code... /* ... comments ... */ code...
+        line = line[:block_comment] + " " + line[end_index+2:]
\ No newline at end of file
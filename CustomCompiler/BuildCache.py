@@ -0,0 +1,122 @@
+from .JackToken import KEYWORD, IDENTIFIER
+import writeToFile
+import hashlib
+import json
+import os
+
+
+# Bump when the compiler's output changes in a way its sources don't show.
+COMPILER_VERSION = "1.0"
+
+# Modules whose code decides the compiled output.
+COMPILER_MODULES = (
+    "CompilationEngine.py", "JackTokenizer.py", "JackToken.py", "JackAST.py",
+    "SymbolTable.py", "Optimizer.py", "VMWriter.py", "XMLWriter.py", "BuildCache.py",
+)
+
+# Directory next to the sources holding one cache entry per class.
+CACHE_DIR = ".jackcache"
+
+
+def compiler_version():
+    '''
+    Identifies the compiler by COMPILER_VERSION and the code of its
+    modules, so editing the compiler invalidates every cache entry.
+    '''
+    digest = hashlib.blake2b(COMPILER_VERSION.encode(), digest_size=16)
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for module in COMPILER_MODULES:
+        with open(os.path.join(directory, module), "rb") as module_file:
+            digest.update(module_file.read())
+    return digest.hexdigest()
+
+
+def source_hash(source):
+    '''
+    Hashes the source of a class.
+    '''
+    return hashlib.blake2b(source.encode(), digest_size=16).hexdigest()
+
+
+def class_signature(tokens):
+    '''
+    Gets what other classes can see of a class: its name and the kind,
+    return type, name and number of parameters of each subroutine.
+    '''
+    name = None
+    subroutines = []
+    for i, token in enumerate(tokens):
+        if token.kind != KEYWORD:
+            continue
+        if token.content == "class" and name is None:
+            name = tokens[i+1].content
+        elif token.content in ("constructor", "function", "method"):
+            # kind type name ( parameters )
+            num_params = 0
+            j = i + 4
+            if tokens[j].content != ")":
+                num_params = 1
+                while tokens[j].content != ")":
+                    if tokens[j].content == ",":
+                        num_params += 1
+                    j += 1
+            subroutines.append([token.content, tokens[i+1].content, tokens[i+2].content, num_params])
+    return {"class": name, "subroutines": subroutines}
+
+
+def class_identifiers(tokens):
+    '''
+    Gets every identifier used in a class, a superset of the classes it
+    depends on.
+    '''
+    return sorted({token.content for token in tokens if token.kind == IDENTIFIER})
+
+
+def dependency_key(class_name, identifiers, signatures):
+    '''
+    Hashes the signatures of the project classes a class refers to, so the
+    class is recompiled when one of them changes.
+    '''
+    digest = hashlib.blake2b(digest_size=16)
+    for identifier in identifiers:
+        if identifier in signatures and identifier != class_name:
+            digest.update(json.dumps(signatures[identifier]).encode())
+    return digest.hexdigest()
+
+
+class BuildCache:
+
+
+    def __init__(self, directory):
+        '''
+        Initializes the cache stored in CACHE_DIR inside directory.
+        '''
+        self.cache_dir = os.path.join(directory, CACHE_DIR)
+
+
+    def load(self, name):
+        '''
+        Loads the cache entry of a class, or None if there is none.
+        '''
+        try:
+            with open(self._entry_path(name), "r") as entry_file:
+                return json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+
+    def store(self, name, entry):
+        '''
+        Stores the cache entry of a class. An entry holds the source hash,
+        compiler version, signature, identifiers, dependency key and
+        whether the vm code was optimized, the ".vm" lines and the xml
+        lines if they were asked for.
+        '''
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with writeToFile.atomicOpen(self._entry_path(name), "w") as entry_file:
+            json.dump(entry, entry_file)
+        return
+
+
+    def _entry_path(self, name):
+        return os.path.join(self.cache_dir, f"{name}.json")
@@ -0,0 +1,70 @@
+from collections import namedtuple
+
+
+# The typed syntax tree CompilationEngine builds from the tokens of a class.
+# Backends like VMWriter and XMLWriter walk it with a Visitor.
+
+Class = namedtuple("Class", ["name", "var_decs", "subroutines"])
+
+# kind is "static" or "field", names share the type.
+ClassVarDec = namedtuple("ClassVarDec", ["kind", "type", "names"])
+
+Parameter = namedtuple("Parameter", ["type", "name"])
+
+VarDec = namedtuple("VarDec", ["type", "names"])
+
+
+class Subroutine(namedtuple("Subroutine", ["kind", "return_type", "name", "parameters", "var_decs", "statements"])):
+
+
+    __slots__ = ()
+
+
+    @property
+    def num_locals(self):
+        return sum(len(var_dec.names) for var_dec in self.var_decs)
+
+
+# Statements. index is None unless an array element is assigned,
+# else_statements is None without an else and value is None for "return;".
+LetStatement = namedtuple("LetStatement", ["target", "index", "value"])
+IfStatement = namedtuple("IfStatement", ["condition", "statements", "else_statements"])
+WhileStatement = namedtuple("WhileStatement", ["condition", "statements"])
+DoStatement = namedtuple("DoStatement", ["call"])
+ReturnStatement = namedtuple("ReturnStatement", ["value"])
+
+# An expression holds a term or a chain of BinaryOps. Chains group to the
+# right and a unary operator applies to the rest of the chain after it, so
+# a - b - c is a - (b - c) and -a + b is -(a + b), as Jack code compiled
+# by this compiler has always behaved.
+Expression = namedtuple("Expression", ["term"])
+BinaryOp = namedtuple("BinaryOp", ["left", "op", "right"])
+UnaryOp = namedtuple("UnaryOp", ["op", "operand"])
+
+# Terms.
+IntegerConstant = namedtuple("IntegerConstant", ["value"])
+StringConstant = namedtuple("StringConstant", ["value"])
+# value is "true", "false", "null" or "this".
+KeywordConstant = namedtuple("KeywordConstant", ["value"])
+# symbol is the SymbolTable entry the name resolved to.
+Variable = namedtuple("Variable", ["name", "symbol"])
+ArrayAccess = namedtuple("ArrayAccess", ["variable", "index"])
+ParenthesizedExpression = namedtuple("ParenthesizedExpression", ["expression"])
+# receiver is None for "name(...)", a Variable for "var.name(...)" and the
+# class name for "Class.name(...)".
+SubroutineCall = namedtuple("SubroutineCall", ["receiver", "name", "arguments"])
+
+# Only made by Optimizer for the vm backend: operand * 2 ** count, done by
+# adding the operand to itself. Optimized IntegerConstants may also be
+# negative.
+ShiftLeft = namedtuple("ShiftLeft", ["operand", "count"])
+
+
+class Visitor:
+
+
+    def visit(self, node):
+        '''
+        Calls the visit_<node type> method of the backend for a node.
+        '''
+        return getattr(self, "visit_" + type(node).__name__)(node)
@@ -1,17 +1,214 @@
 from .CompilationEngine import CompilationEngine
 from .JackTokenizer import JackTokenizer
+from .BuildCache import BuildCache, compiler_version, source_hash, class_signature, class_identifiers, dependency_key
 import sys
 from pathlib import Path
 import os
 import writeToFile
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Fewest classes to compile before build starts worker processes by default,
+# below this starting the workers costs more than it saves.
+PARALLEL_MIN_CLASSES = 8
+
+
+def build():
+    """
+    Handles user inputed file paths or folder paths for compiling ".jack"
+    files straight to ".vm" files. Tokens go from the tokenizer to the
+    compilation engine in memory, so no xml files are written or read.
+    Each class is written to a ".vm" file named after its source file.
+    Classes are only recompiled when their source, the compiler or the
+    signature of a class they use changed since the last build, see
+    BuildCache. Classes that need compiling are compiled in a pool of
+    worker processes when there are at least PARALLEL_MIN_CLASSES of them,
+    --jobs=N sets the number of workers (1 compiles in this process).
+    Pass --xml to also write the parse tree of each class to a ".xml" file,
+    --no-vm to not write vm code (e.g. with --xml), --no-optimize to write
+    the vm code without the Optimizer rewrites, --no-cache to recompile
+    every class and --bundle to also write all of the vm code to one ".vm"
+    file named after the directory. Only the outputs asked for are
+    generated.
+    """
+    write_xml = "--xml" in sys.argv
+    write_vm = "--no-vm" not in sys.argv
+    optimize = "--no-optimize" not in sys.argv
+    use_cache = "--no-cache" not in sys.argv
+    bundle = "--bundle" in sys.argv and write_vm
+    jobs = None
+    for arg in sys.argv:
+        if arg.startswith("--jobs="):
+            jobs = int(arg[len("--jobs="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    default_path = "project10_tests/ArrayTest"
+    # Determine user inputed file path or default file path.
+    if len(args) < 2:
+        print(f"No input path given, default: {default_path}")
+        input_path = default_path
+    else:
+        input_path = args[1]
+    if os.path.isdir(input_path):
+        source_dir = input_path
+        file_paths = [
+            os.path.join(input_path, file_name)
+            for file_name in sorted(os.listdir(input_path))
+            if file_name.endswith(".jack")
+        ]
+    elif os.path.isfile(input_path):
+        source_dir = os.path.dirname(input_path) or "."
+        file_paths = [input_path]
+    else:
+        raise Exception("no path.")
+    tokenizer = JackTokenizer()
+    cache = BuildCache(source_dir) if use_cache else None
+    version = compiler_version()
+
+    # Get the signature of every class first, reusing the cached one when
+    # the source did not change, since classes depend on each other's.
+    classes = []
+    for file_path in file_paths:
+        with open(file_path, "r") as source_file:
+            source = source_file.read()
+        name = Path(file_path).stem
+        digest = source_hash(source)
+        entry = cache.load(name) if cache else None
+        tokens = None
+        if entry is None or entry["source_hash"] != digest or entry["compiler_version"] != version:
+            entry = None
+            tokens = tokenizer.scan(source)
+            signature = class_signature(tokens)
+            identifiers = class_identifiers(tokens)
+        else:
+            signature = entry["signature"]
+            identifiers = entry["identifiers"]
+        classes.append({
+            "file_path": file_path, "name": name, "source": source, "source_hash": digest,
+            "entry": entry, "tokens": tokens, "signature": signature, "identifiers": identifiers,
+        })
+    signatures = {jack_class["signature"]["class"]: jack_class["signature"] for jack_class in classes}
+
+    # Find the classes that need compiling.
+    stale = []
+    for jack_class in classes:
+        entry = jack_class["entry"]
+        jack_class["dependency_key"] = dependency_key(
+            jack_class["signature"]["class"], jack_class["identifiers"], signatures
+        )
+        output_path = str(Path(jack_class["file_path"]).with_suffix(".vm"))
+        xml_path = str(Path(jack_class["file_path"]).with_suffix(".xml"))
+        if (
+            entry is not None and entry["dependency_key"] == jack_class["dependency_key"]
+            and (not write_vm or (entry["vm"] is not None and entry["optimized"] == optimize))
+            and (not write_xml or entry["xml"] is not None)
+        ):
+            # Up to date, only restore outputs that were deleted.
+            if write_vm and not os.path.exists(output_path):
+                writeToFile.outToFolder(output_path, entry["vm"], change=False)
+            if write_xml and not os.path.exists(xml_path):
+                writeToFile.outToFolder(xml_path, entry["xml"], change=False)
+            jack_class["vm"] = entry["vm"]
+            print(f"{output_path if write_vm else xml_path} up to date.")
+        else:
+            stale.append(jack_class)
+
+    # Each class compiles on its own, so they can be compiled in any order
+    # and in parallel. Results are collected in file order.
+    if jobs is None:
+        jobs = os.cpu_count() if len(stale) >= PARALLEL_MIN_CLASSES else 1
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(
+                _compile_source,
+                [jack_class["source"] for jack_class in stale],
+                [write_vm] * len(stale),
+                [write_xml] * len(stale),
+                [optimize] * len(stale),
+            ))
+    else:
+        results = []
+        for jack_class in stale:
+            tokens = jack_class["tokens"]
+            if tokens is None:
+                tokens = tokenizer.scan(jack_class["source"])
+            results.append(CompilationEngine().compile_tokens(tokens, write_vm, write_xml, optimize))
+
+    for jack_class, (vm_lines, xml_lines) in zip(stale, results):
+        output_path = str(Path(jack_class["file_path"]).with_suffix(".vm"))
+        xml_path = str(Path(jack_class["file_path"]).with_suffix(".xml"))
+        if write_vm:
+            writeToFile.outToFolder(output_path, vm_lines, change=False)
+        if write_xml:
+            writeToFile.outToFolder(xml_path, xml_lines, change=False)
+        if cache is not None:
+            cache.store(jack_class["name"], {
+                "source_hash": jack_class["source_hash"],
+                "compiler_version": version,
+                "signature": jack_class["signature"],
+                "identifiers": jack_class["identifiers"],
+                "dependency_key": jack_class["dependency_key"],
+                "optimized": optimize,
+                "vm": vm_lines,
+                "xml": xml_lines,
+            })
+        jack_class["vm"] = vm_lines
+        print(f"{output_path if write_vm else xml_path} created.")
+
+    if bundle:
+        _write_bundle(source_dir, classes)
+    return
+
+
+def _compile_source(source, vm=True, xml=True, optimize=True):
+    """
+    Compiles the source of a single class, in a worker process of build.
+
+    Inputs:
+
+        source: str - the Jack source of the class.
+        vm: bool - whether to generate the vm code.
+        xml: bool - whether to generate the xml parse tree.
+        optimize: bool - whether to optimize the vm code.
+
+    Returns:
+
+        Returns the vm lines and the xml lines of the class, None for an
+        output that was not generated.
+    """
+    tokens = JackTokenizer().scan(source)
+    return CompilationEngine().compile_tokens(tokens, vm, xml, optimize)
+
+
+def _write_bundle(source_dir, classes):
+    """
+    Writes the vm code of every class, in file order, to one ".vm" file
+    named after the directory, like compile does.
+
+    Inputs:
+
+        source_dir: str - the directory of the ".jack" files.
+        classes: list[dict] - the classes of build with their vm lines.
+    """
+    bundle_name = os.path.basename(os.path.normpath(source_dir))
+    if any(jack_class["name"] == bundle_name for jack_class in classes):
+        print(f"Not bundling, {bundle_name}.vm is the output of class {bundle_name}.")
+        return
+    bundle_path = os.path.join(source_dir, bundle_name + ".vm")
+    writeToFile.outToFolder(
+        bundle_path, [line for jack_class in classes for line in jack_class["vm"]], change=False
+    )
+    print(f"{bundle_path} created.")
+    return
 
 
 def compile():
     """
     Handles user inputed file paths or folder paths for translating into xml.
     If no path is given, defaults to a pre-assigned path.
+    Pass --no-optimize to write the vm code without the Optimizer rewrites.
     """
-    args = sys.argv
+    optimize = "--no-optimize" not in sys.argv
+    args = [arg for arg in sys.argv if arg != "--no-optimize"]
     default_path = "project10_tests/ArrayTest"
     # Determine user inputed file path or default file path.
     if len(args) < 2:
@@ -28,8 +225,8 @@ def compile():
             file_path = os.path.join(input_path, file_name)
             if os.path.isfile(file_path):
                 ce = CompilationEngine()
-                contents = writeToFile.parseFile(file_path)
-                ce_xml, p10_xml = ce.compile(contents)
+                contents = (line for _, line in writeToFile.streamFile(file_path))
+                ce_xml, p10_xml = ce.compile(contents, optimize=optimize)
                 all_xml += ce_xml
                 p10_output = Path(file_name).stem + "p10output.xml"
                 output_file = Path(file_name).stem + "_TCEoutput.vm"
@@ -51,7 +248,7 @@ def tokenize():
     Handles user inputed file paths or folder paths for translating into xml.
     If no path is given, defaults to a pre-assigned path.
     """
-    args = sys.argv
+    args = [arg for arg in sys.argv if arg != "--no-optimize"]
     default_path = "project10_tests/ArrayTest"
     # Determine user inputed file path or default file path.
     if len(args) < 2:
@@ -67,8 +264,8 @@ def tokenize():
                 continue
             file_path = os.path.join(input_path, file_name)
             if os.path.isfile(file_path):
-                contents = writeToFile.parseFile(file_path)
-                xml_lines = tokenizer.tokenize(contents)
+                with open(file_path, "r") as source_file:
+                    xml_lines = tokenizer.tokenize(source_file.read().splitlines())
                 output_file = Path(file_name).stem + "_Toutput.xml"
                 main_xml_file = os.path.join(input_path, output_file)
                 writeToFile.outToFolder(main_xml_file, xml_lines, change=False)
@@ -79,5 +276,10 @@ def tokenize():
 
 
 if __name__ == "__main__":
-    tokenize()
-    compile()
\ No newline at end of file
+    if "--xml-files" in sys.argv:
+        # The old two step build through *_Toutput.xml files.
+        sys.argv.remove("--xml-files")
+        tokenize()
+        compile()
+    else:
+        build()
\ No newline at end of file
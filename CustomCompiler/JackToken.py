@@ -0,0 +1,76 @@
+import re
+import sys
+
+
+# Token kinds.
+KEYWORD, SYMBOL, INTEGER_CONSTANT, STRING_CONSTANT, IDENTIFIER, END = range(6)
+
+# Kind -> xml tag, END marks the end of the token stream.
+TAGS = ("keyword", "symbol", "integerConstant", "stringConstant", "identifier", "")
+KINDS = {tag: kind for kind, tag in enumerate(TAGS)}
+
+XML_ESCAPES = {"<": "&lt;", ">": "&gt;", "&": "&amp;", '"': "&quot;"}
+XML_UNESCAPES = {escaped: symbol for symbol, escaped in XML_ESCAPES.items()}
+
+# A line of tokenizer xml, e.g. <keyword> class </keyword>.
+XML_TOKEN_RE = re.compile(r"<(\w+)> (.*) </\1>")
+
+
+class Token:
+
+
+    __slots__ = ("kind", "content", "line", "column")
+
+
+    def __init__(self, kind, content, line=0, column=0):
+        '''
+        Initializes a token with its kind, its text (interned, without the
+        quotes of a string constant) and where it starts in the source.
+        '''
+        self.kind = kind
+        self.content = sys.intern(content)
+        self.line = line
+        self.column = column
+
+
+    @classmethod
+    def from_xml(cls, line):
+        '''
+        Creates a token from a line of tokenizer xml. Lines that are not a
+        token, like <tokens>, become END tokens.
+        '''
+        match = XML_TOKEN_RE.match(line.strip())
+        if match is None or match.group(1) not in KINDS:
+            return cls(END, "")
+        content = match.group(2)
+        return cls(KINDS[match.group(1)], XML_UNESCAPES.get(content, content))
+
+
+    @property
+    def tag(self):
+        return TAGS[self.kind]
+
+
+    def is_keyword(self):
+        return self.kind == KEYWORD
+
+
+    def content_is(self, contents):
+        return self.content in contents
+
+
+    @classmethod
+    def many_to_str(cls, contents):
+        '''
+        Converts a list of tokens and strings to a list of strings.
+        '''
+        return [line if isinstance(line, str) else line.to_str() for line in contents]
+
+
+    def to_str(self):
+        content = XML_ESCAPES.get(self.content, self.content) if self.kind == SYMBOL else self.content
+        return f"<{self.tag}> {content} </{self.tag}>"
+
+
+    def __repr__(self):
+        return f"Token({self.tag}, {self.content!r}, {self.line}:{self.column})"
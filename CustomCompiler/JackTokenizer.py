@@ -3,15 +3,44 @@ from pathlib import Path
 import os
 import writeToFile
 import re
+from .JackToken import Token, KEYWORD, SYMBOL, INTEGER_CONSTANT, STRING_CONSTANT, IDENTIFIER, END
+
+
+# Every token and everything between tokens, classified by the name of the
+# group that matched. Comments and strings are matched as a whole, so "//"
+# inside a string and "/* */" comments over several lines are handled.
+TOKEN_RE = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<stringConstant>"[^"\n]*")
+  | (?P<keyword>(?:class|constructor|function|method|field|static|var|int|char|boolean|void|true|false|null|this|let|do|if|else|while|return)\b)
+  | (?P<identifier>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<integerConstant>[0-9]+)
+  | (?P<unterminated>/\*|")
+  | (?P<symbol>[{}()\[\].,;+\-*/&|<>=~])
+  | (?P<error>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Group name -> token kind.
+GROUP_KINDS = {
+    "keyword": KEYWORD,
+    "symbol": SYMBOL,
+    "integerConstant": INTEGER_CONSTANT,
+    "stringConstant": STRING_CONSTANT,
+    "identifier": IDENTIFIER,
+}
+
+# Largest integer constant in Jack.
+MAX_INTEGER = 32767
 
 class JackTokenizer:
 
 
     def __init__(self):
         '''
-        Initialize Jack Tokenizer with regular expressions for parsing.
+        Initialize Jack Tokenizer with the regular expression for scanning.
         '''
-        self._token_re()
+        self.token_re = TOKEN_RE
 
 
     def tokenize(self, contents):
@@ -19,48 +48,45 @@ class JackTokenizer:
         Basic tokenizer for a Jack program.
         '''
         tokens = ["<tokens>"]
-        contents = self.parse(contents)
-        for token in contents:
-            if re.match(self.keyword_pattern, token):
-                tokens += [f"<keyword> {token} </keyword>"]
-            elif re.match(self.symbol_pattern, token):
-                if token == ">":
-                    token = "&gt;"
-                elif token == "<":
-                    token = "&lt;"
-                elif token == "&":
-                    token = "&amp;"
-                elif token == "\"":
-                    token = "&quot;"
-                tokens += [f"<symbol> {token} </symbol>"]
-            elif re.match(self.integer_constant_pattern, token):
-                tokens += [f"<integerConstant> {token} </integerConstant>"]
-            elif re.match(self.string_constant_pattern, token):
-                token = token.replace("\"", '')
-                tokens += [f"<stringConstant> {token} </stringConstant>"]
-            elif re.match(self.identifier_pattern, token):
-                tokens += [f"<identifier> {token} </identifier>"]        
+        tokens += [token.to_str() for token in self.scan("\n".join(contents))[:-1]]
         tokens += ["</tokens>"]
         return tokens
 
 
-    def parse(self, contents):
-        '''
-        Gets all relevant tokens from the Jack program.
-        '''
-        parsed_contents = []
-        for line in contents:
-            parsed_contents += re.findall(self.token_pattern, line)
-        return parsed_contents
-    
-
-    def _token_re(self):
+    def scan(self, source):
         '''
-        Initializes regular expressions for finding tokens.
+        Tokenizes the source of a Jack program straight into the Token
+        objects CompilationEngine.compile_tokens works on, in a single pass
+        of one regular expression. Comments are skipped and every token
+        records the line and column it starts at. The list ends with an
+        END token.
         '''
-        self.keyword_pattern = r'\b(?:class|constructor|function|method|field|static|var|int|char|boolean|void|true|false|null|this|let|do|if|else|while|return)\b'
-        self.symbol_pattern = r'[\{\}\(\)\[\]\.\,\;\+\-\*\/&\|<>=~]'
-        self.integer_constant_pattern = r'\b(?:0|[1-9][0-9]{0,4})\b'
-        self.string_constant_pattern = r'"[^"\n]*"'
-        self.identifier_pattern = r'\b[a-zA-Z_][a-zA-Z0-9_]*\b'
-        self.token_pattern = f'{self.keyword_pattern}|{self.symbol_pattern}|{self.integer_constant_pattern}|{self.string_constant_pattern}|{self.identifier_pattern}'
\ No newline at end of file
+        tokens = []
+        append = tokens.append
+        line_number = 1
+        line_start = 0
+        for match in self.token_re.finditer(source):
+            group = match.lastgroup
+            start = match.start()
+            kind = GROUP_KINDS.get(group)
+            if kind is not None:
+                token = match.group()
+                if kind == STRING_CONSTANT:
+                    token = token[1:-1]
+                elif kind == INTEGER_CONSTANT and int(token) > MAX_INTEGER:
+                    raise ValueError(f"{line_number}:{start - line_start + 1}: integer {token} is larger than {MAX_INTEGER}")
+                append(Token(kind, token, line_number, start - line_start + 1))
+                continue
+            if group == "unterminated":
+                what = "string" if match.group() == '"' else "comment"
+                raise ValueError(f"{line_number}:{start - line_start + 1}: unterminated {what}")
+            if group == "error":
+                raise ValueError(f"{line_number}:{start - line_start + 1}: unexpected character {match.group()!r}")
+            # Whitespace and comments can span lines.
+            newlines = source.count("\n", start, match.end())
+            if newlines:
+                line_number += newlines
+                line_start = source.rindex("\n", start, match.end()) + 1
+        # Stands in for the closing </tokens> line the engine may look at.
+        tokens.append(Token(END, "", line_number + 1, 1))
+        return tokens
\ No newline at end of file
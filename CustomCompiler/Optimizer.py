@@ -0,0 +1,259 @@
+from .JackAST import (
+    Visitor, Expression, BinaryOp, UnaryOp, IntegerConstant, KeywordConstant, Variable, ArrayAccess,
+    ShiftLeft,
+)
+
+
+# Values of the keyword constants that are numbers.
+KEYWORD_VALUES = {"true": -1, "false": 0, "null": 0}
+
+
+def wrap(value):
+    '''
+    Wraps an integer to a signed 16 bit word like the Hack ALU.
+    '''
+    return ((value + 32768) & 0xFFFF) - 32768
+
+
+def fold(op, x, y):
+    '''
+    Computes x op y for two constants like the compiled code would at run
+    time, or returns None when it can't be known at compile time.
+    '''
+    if op == "+":
+        return wrap(x + y)
+    if op == "-":
+        return wrap(x - y)
+    if op == "*":
+        # Math.multiply keeps the low 16 bits of the product.
+        return wrap(x * y)
+    if op == "/":
+        # Dividing by 0 is an error at run time and -32768 has no
+        # positive value for Math.divide to work on.
+        if y == 0 or x == -32768 or y == -32768:
+            return None
+        quotient = abs(x) // abs(y)
+        return -quotient if (x < 0) != (y < 0) else quotient
+    if op == "&":
+        return wrap(x & y)
+    if op == "|":
+        return wrap(x | y)
+    if op == "=":
+        return -1 if x == y else 0
+    # The assembly of lt and gt compares the sign of x - y, which is wrong
+    # when the subtraction overflows, so those are left to run time.
+    if not -32768 <= x - y <= 32767:
+        return None
+    if op == "<":
+        return -1 if x < y else 0
+    return -1 if x > y else 0
+
+
+def power_of_two(value):
+    '''
+    Gets k when value is 2 ** k, otherwise None.
+    '''
+    if value > 0 and value & (value - 1) == 0:
+        return value.bit_length() - 1
+    return None
+
+
+class Optimizer(Visitor):
+
+
+    def optimize(self, classes):
+        '''
+        Rewrites the syntax tree of a list of classes into one that compiles
+        to less vm code with the same results: constant expressions are
+        folded, multiplying by a power of two becomes additions and double
+        negations are removed. Only the vm backend should see the result.
+        '''
+        return [self.visit(node) for node in classes]
+
+
+    def visit_Class(self, node):
+        return node._replace(subroutines=[self.visit(subroutine) for subroutine in node.subroutines])
+
+
+    def visit_Subroutine(self, node):
+        return node._replace(statements=self._statements(node.statements))
+
+
+    def _statements(self, statements):
+        return [self.visit(statement) for statement in statements]
+
+
+    def visit_LetStatement(self, node):
+        index = None if node.index is None else self.visit(node.index)
+        return node._replace(index=index, value=self.visit(node.value))
+
+
+    def visit_IfStatement(self, node):
+        else_statements = None if node.else_statements is None else self._statements(node.else_statements)
+        return node._replace(
+            condition=self.visit(node.condition),
+            statements=self._statements(node.statements),
+            else_statements=else_statements,
+        )
+
+
+    def visit_WhileStatement(self, node):
+        return node._replace(condition=self.visit(node.condition), statements=self._statements(node.statements))
+
+
+    def visit_DoStatement(self, node):
+        return node._replace(call=self.visit(node.call))
+
+
+    def visit_ReturnStatement(self, node):
+        return node if node.value is None else node._replace(value=self.visit(node.value))
+
+
+    def visit_Expression(self, node):
+        return Expression(self.visit(node.term))
+
+
+    def visit_ParenthesizedExpression(self, node):
+        # The vm code of a node is always evaluated as a whole, so the
+        # parentheses are only needed by the parse tree.
+        return self.visit(node.expression.term)
+
+
+    def visit_IntegerConstant(self, node):
+        return node
+
+
+    def visit_StringConstant(self, node):
+        return node
+
+
+    def visit_KeywordConstant(self, node):
+        return node
+
+
+    def visit_Variable(self, node):
+        return node
+
+
+    def visit_ArrayAccess(self, node):
+        return node._replace(index=self.visit(node.index))
+
+
+    def visit_SubroutineCall(self, node):
+        return node._replace(arguments=[self.visit(argument) for argument in node.arguments])
+
+
+    def visit_UnaryOp(self, node):
+        operand = self.visit(node.operand)
+        if node.op == "-":
+            return self._negate(operand)
+        value = self._value(operand)
+        if value is not None:
+            return IntegerConstant(wrap(~value))
+        if isinstance(operand, UnaryOp) and operand.op == "~":
+            return operand.operand
+        return UnaryOp("~", operand)
+
+
+    def visit_BinaryOp(self, node):
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+        op = node.op
+        x = self._value(left)
+        y = self._value(right)
+        if x is not None and y is not None:
+            value = fold(op, x, y)
+            if value is not None:
+                return IntegerConstant(value)
+        if op == "*":
+            # The constant is dropped, it has no side effects wherever it is.
+            product = None
+            if y is not None:
+                product = self._multiply(left, y)
+            elif x is not None:
+                product = self._multiply(right, x)
+            if product is not None:
+                return product
+        elif op == "/":
+            if y == 1:
+                return left
+            if y == -1:
+                return self._negate(left)
+        elif op == "+":
+            if y == 0:
+                return left
+            if x == 0:
+                return right
+        elif op == "-":
+            if y == 0:
+                return left
+            if x == 0:
+                return self._negate(right)
+        elif op == "&":
+            if y == -1:
+                return left
+            if x == -1:
+                return right
+        elif op == "|":
+            if y == 0:
+                return left
+            if x == 0:
+                return right
+        return BinaryOp(left, op, right)
+
+
+    def _multiply(self, node, factor):
+        '''
+        Multiplies a node by a constant without Math.multiply, or returns
+        None if that isn't cheaper.
+        '''
+        if factor == 1:
+            return node
+        if factor == -1:
+            return self._negate(node)
+        if factor == 0 and self._is_pure(node):
+            return IntegerConstant(0)
+        count = power_of_two(factor)
+        if count is not None:
+            return ShiftLeft(node, count)
+        count = power_of_two(-factor)
+        if count is not None:
+            return UnaryOp("-", ShiftLeft(node, count))
+        return None
+
+
+    def _negate(self, node):
+        value = self._value(node)
+        if value is not None:
+            return IntegerConstant(wrap(-value))
+        if isinstance(node, UnaryOp) and node.op == "-":
+            return node.operand
+        return UnaryOp("-", node)
+
+
+    def _value(self, node):
+        '''
+        Gets the value of a constant node, or None.
+        '''
+        if isinstance(node, IntegerConstant):
+            return node.value
+        if isinstance(node, KeywordConstant):
+            return KEYWORD_VALUES.get(node.value)
+        return None
+
+
+    def _is_pure(self, node):
+        '''
+        Checks if leaving out the code of a node changes nothing but the
+        value it pushes.
+        '''
+        if isinstance(node, (IntegerConstant, KeywordConstant, Variable)):
+            return True
+        if isinstance(node, ArrayAccess):
+            return self._is_pure(node.index)
+        if isinstance(node, (UnaryOp, ShiftLeft)):
+            return self._is_pure(node.operand)
+        if isinstance(node, BinaryOp):
+            # Math.divide stops the program when dividing by 0.
+            return node.op != "/" and self._is_pure(node.left) and self._is_pure(node.right)
+        return False
@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+
+# Kinds of variables, named after the vm segment that holds them.
+STATIC, FIELD, ARGUMENT, LOCAL = "static", "this", "argument", "local"
+KINDS = (STATIC, FIELD, ARGUMENT, LOCAL)
+
+Symbol = namedtuple("Symbol", ["name", "type", "kind", "index"])
+
+
+class Scope:
+
+
+    __slots__ = ("name", "symbols", "counts")
+
+
+    def __init__(self, name):
+        '''
+        Initializes an empty scope, a class or a subroutine.
+        '''
+        self.name = name
+        self.symbols = {}
+        self.counts = dict.fromkeys(KINDS, 0)
+
+
+class SymbolTable:
+
+
+    def __init__(self, class_name=None):
+        '''
+        Initializes a table holding only the scope of a class. Scopes
+        are kept after they are popped so the table can be dumped.
+        '''
+        self.scopes = []
+        self.closed = []
+        self.push_scope(class_name)
+
+
+    def push_scope(self, name=None):
+        '''
+        Opens a scope, e.g. for a subroutine. Its names hide the same
+        names of outer scopes and its indexes start at 0.
+        '''
+        self.scopes.append(Scope(name))
+        return
+
+
+    def pop_scope(self):
+        '''
+        Closes the innermost scope, the class scope can't be closed.
+        '''
+        if len(self.scopes) == 1:
+            raise IndexError("can't pop the class scope.")
+        self.closed.append(self.scopes.pop())
+        return
+
+
+    def define(self, name, var_type, kind):
+        '''
+        Defines a variable in the innermost scope with the next index of
+        its kind.
+        '''
+        if kind not in KINDS:
+            raise ValueError(f"{kind} is not a kind of variable.")
+        scope = self.scopes[-1]
+        if name in scope.symbols:
+            raise ValueError(f"{name} is already defined in {scope.name}.")
+        symbol = Symbol(name, var_type, kind, scope.counts[kind])
+        scope.symbols[name] = symbol
+        scope.counts[kind] += 1
+        return symbol
+
+
+    def reserve(self, kind):
+        '''
+        Skips the next index of a kind in the innermost scope, e.g.
+        argument 0 holding this in a method.
+        '''
+        self.scopes[-1].counts[kind] += 1
+        return
+
+
+    def lookup(self, name):
+        '''
+        Finds a variable in the innermost scope defining it, or None.
+        '''
+        for scope in reversed(self.scopes):
+            symbol = scope.symbols.get(name)
+            if symbol is not None:
+                return symbol
+        return None
+
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+
+    def __getitem__(self, name):
+        symbol = self.lookup(name)
+        if symbol is None:
+            raise KeyError(f"{name} not in any table.")
+        return symbol
+
+
+    def var_count(self, kind):
+        '''
+        Counts the indexes of a kind used in the open scopes.
+        '''
+        return sum(scope.counts[kind] for scope in self.scopes)
+
+
+    def dump(self, scope=None, kind=None):
+        '''
+        Lists every variable defined so far as a dict of its scope, name,
+        type, kind and index, class scope first and subroutines in order.
+        Pass scope or kind to only list the variables of one.
+        '''
+        rows = []
+        for defined in [self.scopes[0]] + self.closed + self.scopes[1:]:
+            if scope is not None and defined.name != scope:
+                continue
+            for symbol in defined.symbols.values():
+                if kind is None or symbol.kind == kind:
+                    rows.append({"scope": defined.name, **symbol._asdict()})
+        return rows
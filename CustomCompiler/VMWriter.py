@@ -0,0 +1,245 @@
+from .JackAST import Visitor, Variable
+
+
+# Jack operator -> vm command.
+OPERATORS = {
+    "+": "add",
+    "-": "sub",
+    "*": "call Math.multiply 2",
+    "/": "call Math.divide 2",
+    "&": "and",
+    "|": "or",
+    "<": "lt",
+    ">": "gt",
+    "=": "eq",
+}
+UNARY_OPERATORS = {"-": "neg", "~": "not"}
+
+# Character -> code pushed by string constants.
+CHARACTERS = {
+    ' ': 32, '!': 33, '"': 34, '#': 35, '$': 36, '%': 37, '&': 38, "'": 39,
+    '(': 40, ')': 41, '*': 42, '+': 43, ',': 44, '-': 45, '.': 46, '/': 92,
+    '0': 48, '1': 49, '2': 50, '3': 51, '4': 52, '5': 53, '6': 54, '7': 55,
+    '8': 56, '9': 57, ':': 58, ';': 59, '<': 60, '=': 61, '>': 62, '?': 63,
+    '@': 64, 'A': 65, 'B': 66, 'C': 67, 'D': 68, 'E': 69, 'F': 70, 'G': 71,
+    'H': 72, 'I': 73, 'J': 74, 'K': 75, 'L': 76, 'M': 77, 'N': 78, 'O': 79,
+    'P': 80, 'Q': 81, 'R': 82, 'S': 83, 'T': 84, 'U': 85, 'V': 86, 'W': 87,
+    'X': 88, 'Y': 89, 'Z': 90, '[': 91, ']': 93, '^': 94, '_': 95, '`': 96,
+    'a': 97, 'b': 98, 'c': 99, 'd': 100, 'e': 101, 'f': 102, 'g': 103,
+    'h': 104, 'i': 105, 'j': 106, 'k': 107, 'l': 108, 'm': 109, 'n': 110,
+    'o': 111, 'p': 112, 'q': 113, 'r': 114, 's': 115, 't': 116, 'u': 117,
+    'v': 118, 'w': 119, 'x': 120, 'y': 121, 'z': 122, '{': 123, '|': 124,
+    '}': 125, '~': 126,
+}
+
+
+class VMWriter(Visitor):
+
+
+    def __init__(self):
+        '''
+        Initializes the vm code backend.
+        '''
+        self.lines = []
+        self.cur_class = None
+        self.subroutines = {}
+        self.num_fields = 0
+        self.label_counter = 0
+
+
+    def write(self, classes):
+        '''
+        Writes the vm code of a list of classes.
+        '''
+        for node in classes:
+            self.visit(node)
+        return self.lines
+
+
+    def create_label(self):
+        label = f"{self.cur_class}_{self.label_counter}"
+        self.label_counter += 1
+        return label
+
+
+    def visit_Class(self, node):
+        self.cur_class = node.name
+        # Calls without a receiver need the kind of the subroutine called.
+        self.subroutines = {subroutine.name: subroutine for subroutine in node.subroutines}
+        self.num_fields = sum(len(var_dec.names) for var_dec in node.var_decs if var_dec.kind == "field")
+        for subroutine in node.subroutines:
+            self.visit(subroutine)
+
+
+    def visit_Subroutine(self, node):
+        self.lines.append(f"function {self.cur_class}.{node.name} {node.num_locals}")
+        if node.kind == "method":
+            self.lines.append("push argument 0")
+            self.lines.append("pop pointer 0")
+        elif node.kind == "constructor":
+            self.lines.append(f"push constant {self.num_fields}")
+            self.lines.append("call Memory.alloc 1")
+            self.lines.append("pop pointer 0")
+        self._statements(node.statements)
+
+
+    def _statements(self, statements):
+        for statement in statements:
+            self.visit(statement)
+
+
+    def visit_LetStatement(self, node):
+        if node.index is None:
+            self.visit(node.value)
+            self.lines.append(f"pop {self._segment(node.target)}")
+            return
+        self.visit(node.index)
+        self.lines.append(f"push {self._segment(node.target)}")
+        self.lines.append("add")
+        self.visit(node.value)
+        self.lines.append("pop temp 0")
+        self.lines.append("pop pointer 1")
+        self.lines.append("push temp 0")
+        self.lines.append("pop that 0")
+
+
+    def visit_IfStatement(self, node):
+        self.visit(node.condition)
+        self.lines.append("not")
+        if_label = self.create_label()
+        end_if = self.create_label()
+        self.lines.append(f"if-goto {end_if}")
+        self._statements(node.statements)
+        self.lines.append(f"goto {if_label}")
+        self.lines.append(f"label {end_if}")
+        if node.else_statements is not None:
+            self._statements(node.else_statements)
+        self.lines.append(f"label {if_label}")
+
+
+    def visit_WhileStatement(self, node):
+        while_label = self.create_label()
+        self.lines.append(f"label {while_label}")
+        self.visit(node.condition)
+        self.lines.append("not")
+        goto_label = self.create_label()
+        self.lines.append(f"if-goto {goto_label}")
+        self._statements(node.statements)
+        self.lines.append(f"goto {while_label}")
+        self.lines.append(f"label {goto_label}")
+
+
+    def visit_DoStatement(self, node):
+        self.visit(node.call)
+        self.lines.append("pop temp 0")
+
+
+    def visit_ReturnStatement(self, node):
+        if node.value is None:
+            self.lines.append("push constant 0")
+        else:
+            self.visit(node.value)
+        self.lines.append("return")
+
+
+    def visit_Expression(self, node):
+        self.visit(node.term)
+
+
+    def visit_BinaryOp(self, node):
+        self.visit(node.left)
+        self.visit(node.right)
+        self.lines.append(OPERATORS[node.op])
+
+
+    def visit_UnaryOp(self, node):
+        self.visit(node.operand)
+        self.lines.append(UNARY_OPERATORS[node.op])
+
+
+    def visit_IntegerConstant(self, node):
+        if node.value >= 0:
+            self.lines.append(f"push constant {node.value}")
+        elif node.value == -32768:
+            self.lines.append("push constant 32767")
+            self.lines.append("not")
+        else:
+            self.lines.append(f"push constant {-node.value}")
+            self.lines.append("neg")
+
+
+    def visit_StringConstant(self, node):
+        self.lines.append(f"push constant {len(node.value)}")
+        self.lines.append("call String.new 1")
+        for character in node.value:
+            self.lines.append(f"push constant {CHARACTERS[character]}")
+            self.lines.append("call String.appendChar 2")
+
+
+    def visit_KeywordConstant(self, node):
+        if node.value == "true":
+            self.lines.append("push constant 1")
+            self.lines.append("neg")
+        elif node.value == "this":
+            self.lines.append("push pointer 0")
+        else:
+            self.lines.append("push constant 0")
+
+
+    def visit_Variable(self, node):
+        self.lines.append(f"push {self._segment(node)}")
+
+
+    def visit_ArrayAccess(self, node):
+        self.visit(node.index)
+        self.lines.append(f"push {self._segment(node.variable)}")
+        self.lines.append("add")
+        self.lines.append("pop pointer 1")
+        self.lines.append("push that 0")
+
+
+    def visit_ParenthesizedExpression(self, node):
+        self.visit(node.expression)
+
+
+    def visit_ShiftLeft(self, node):
+        count = node.count
+        if isinstance(node.operand, Variable):
+            # A variable is doubled by pushing it twice.
+            self.visit(node.operand)
+            self.visit(node.operand)
+            self.lines.append("add")
+            count -= 1
+        else:
+            self.visit(node.operand)
+        for _ in range(count):
+            # temp 1 is only used in between these commands.
+            self.lines.append("pop temp 1")
+            self.lines.append("push temp 1")
+            self.lines.append("push temp 1")
+            self.lines.append("add")
+
+
+    def visit_SubroutineCall(self, node):
+        num_args = len(node.arguments)
+        if node.receiver is None:
+            # A method of this class is called on this, anything else of
+            # the class is called like Class.name(...).
+            subroutine = self.subroutines.get(node.name)
+            if subroutine is not None and subroutine.kind == "method":
+                self.lines.append("push pointer 0")
+                num_args += 1
+            name = f"{self.cur_class}.{node.name}"
+        elif isinstance(node.receiver, str):
+            name = f"{node.receiver}.{node.name}"
+        else:
+            self.visit(node.receiver)
+            num_args += 1
+            name = f"{node.receiver.symbol.type}.{node.name}"
+        for argument in node.arguments:
+            self.visit(argument)
+        self.lines.append(f"call {name} {num_args}")
+
+
+    def _segment(self, variable):
+        return f"{variable.symbol.kind} {variable.symbol.index}"
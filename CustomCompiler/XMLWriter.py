@@ -0,0 +1,256 @@
+from .JackAST import Visitor, BinaryOp
+from .JackToken import TAGS, XML_ESCAPES, KEYWORD, SYMBOL, INTEGER_CONSTANT, STRING_CONSTANT, IDENTIFIER
+
+
+# Types written as keywords, any other type is a class name.
+TYPE_KEYWORDS = ("int", "char", "boolean", "void")
+
+
+class XMLWriter(Visitor):
+
+
+    def __init__(self):
+        '''
+        Initializes the xml parse tree backend.
+        '''
+        self.lines = []
+
+
+    def write(self, classes):
+        '''
+        Writes the parse tree of a list of classes, one xml tag per line.
+        '''
+        for node in classes:
+            self.visit(node)
+        return self.lines
+
+
+    def _token(self, kind, content):
+        # Same as Token.to_str, without making a Token.
+        if kind == SYMBOL:
+            content = XML_ESCAPES.get(content, content)
+        self.lines.append(f"<{TAGS[kind]}> {content} </{TAGS[kind]}>")
+
+
+    def _keyword(self, content):
+        self._token(KEYWORD, content)
+
+
+    def _symbol(self, content):
+        self._token(SYMBOL, content)
+
+
+    def _identifier(self, content):
+        self._token(IDENTIFIER, content)
+
+
+    def _type(self, var_type):
+        self._token(KEYWORD if var_type in TYPE_KEYWORDS else IDENTIFIER, var_type)
+
+
+    def _names(self, names):
+        for index, name in enumerate(names):
+            if index:
+                self._symbol(",")
+            self._identifier(name)
+
+
+    def visit_Class(self, node):
+        self.lines.append("<class>")
+        self._keyword("class")
+        self._identifier(node.name)
+        self._symbol("{")
+        for var_dec in node.var_decs:
+            self.visit(var_dec)
+        for subroutine in node.subroutines:
+            self.visit(subroutine)
+        self._symbol("}")
+        self.lines.append("</class>")
+
+
+    def visit_ClassVarDec(self, node):
+        self.lines.append("<classVarDec>")
+        self._keyword(node.kind)
+        self._type(node.type)
+        self._names(node.names)
+        self._symbol(";")
+        self.lines.append("</classVarDec>")
+
+
+    def visit_Subroutine(self, node):
+        self.lines.append("<subroutineDec>")
+        self._keyword(node.kind)
+        self._type(node.return_type)
+        self._identifier(node.name)
+        self._symbol("(")
+        self.lines.append("<parameterList>")
+        for index, parameter in enumerate(node.parameters):
+            if index:
+                self._symbol(",")
+            self._type(parameter.type)
+            self._identifier(parameter.name)
+        self.lines.append("</parameterList>")
+        self._symbol(")")
+        self.lines.append("<subroutineBody>")
+        self._symbol("{")
+        for var_dec in node.var_decs:
+            self.visit(var_dec)
+        # The body has no <statements> when it has no statements.
+        if node.statements:
+            self._statements(node.statements)
+        self._symbol("}")
+        self.lines.append("</subroutineBody>")
+        self.lines.append("</subroutineDec>")
+
+
+    def visit_VarDec(self, node):
+        self.lines.append("<varDec>")
+        self._keyword("var")
+        self._type(node.type)
+        self._names(node.names)
+        self._symbol(";")
+        self.lines.append("</varDec>")
+
+
+    def _statements(self, statements):
+        self.lines.append("<statements>")
+        for statement in statements:
+            self.visit(statement)
+        self.lines.append("</statements>")
+
+
+    def _block(self, statements):
+        self._symbol("{")
+        self._statements(statements)
+        self._symbol("}")
+
+
+    def visit_LetStatement(self, node):
+        self.lines.append("<letStatement>")
+        self._keyword("let")
+        self._identifier(node.target.name)
+        if node.index is not None:
+            self._symbol("[")
+            self.visit(node.index)
+            self._symbol("]")
+        self._symbol("=")
+        self.visit(node.value)
+        self._symbol(";")
+        self.lines.append("</letStatement>")
+
+
+    def visit_IfStatement(self, node):
+        self.lines.append("<ifStatement>")
+        self._keyword("if")
+        self._symbol("(")
+        self.visit(node.condition)
+        self._symbol(")")
+        self._block(node.statements)
+        if node.else_statements is not None:
+            self._keyword("else")
+            self._block(node.else_statements)
+        self.lines.append("</ifStatement>")
+
+
+    def visit_WhileStatement(self, node):
+        self.lines.append("<whileStatement>")
+        self._keyword("while")
+        self._symbol("(")
+        self.visit(node.condition)
+        self._symbol(")")
+        self._block(node.statements)
+        self.lines.append("</whileStatement>")
+
+
+    def visit_DoStatement(self, node):
+        self.lines.append("<doStatement>")
+        self._keyword("do")
+        self._call(node.call)
+        self._symbol(";")
+        self.lines.append("</doStatement>")
+
+
+    def visit_ReturnStatement(self, node):
+        self.lines.append("<returnStatement>")
+        self._keyword("return")
+        if node.value is not None:
+            self.visit(node.value)
+        self._symbol(";")
+        self.lines.append("</returnStatement>")
+
+
+    def visit_Expression(self, node):
+        self.lines.append("<expression>")
+        self._chain(node.term)
+        self.lines.append("</expression>")
+
+
+    def _chain(self, node):
+        '''
+        Writes a term or a chain of operators and terms, flat like the
+        tokens it was parsed from.
+        '''
+        while isinstance(node, BinaryOp):
+            self._term(node.left)
+            self._symbol(node.op)
+            node = node.right
+        self._term(node)
+
+
+    def _term(self, node):
+        self.lines.append("<term>")
+        self.visit(node)
+        self.lines.append("</term>")
+
+
+    def visit_UnaryOp(self, node):
+        self._symbol(node.op)
+        self._chain(node.operand)
+
+
+    def visit_IntegerConstant(self, node):
+        self._token(INTEGER_CONSTANT, str(node.value))
+
+
+    def visit_StringConstant(self, node):
+        self._token(STRING_CONSTANT, node.value)
+
+
+    def visit_KeywordConstant(self, node):
+        self._keyword(node.value)
+
+
+    def visit_Variable(self, node):
+        self._identifier(node.name)
+
+
+    def visit_ArrayAccess(self, node):
+        self._identifier(node.variable.name)
+        self._symbol("[")
+        self.visit(node.index)
+        self._symbol("]")
+
+
+    def visit_ParenthesizedExpression(self, node):
+        self._symbol("(")
+        self.visit(node.expression)
+        self._symbol(")")
+
+
+    def visit_SubroutineCall(self, node):
+        self._call(node)
+
+
+    def _call(self, node):
+        if node.receiver is not None:
+            self._identifier(node.receiver if isinstance(node.receiver, str) else node.receiver.name)
+            self._symbol(".")
+        self._identifier(node.name)
+        self._symbol("(")
+        self.lines.append("<expressionList>")
+        for index, argument in enumerate(node.arguments):
+            if index:
+                self._symbol(",")
+            self.visit(argument)
+        self.lines.append("</expressionList>")
+        self._symbol(")")
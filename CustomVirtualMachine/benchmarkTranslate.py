@@ -0,0 +1,202 @@
+# Micro-benchmark of the VM to assembly translation.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: benchmarkTranslate.py
+# Date: 10/18/2026
+
+
+import writeToFile
+from hackVirtualMachine import VirtualMachine
+import sys
+import os
+import time
+
+
+# One sample line per kind of VM command.
+SAMPLE_COMMANDS = [
+    "push constant 7",
+    "push local 2",
+    "push argument 1",
+    "push this 0",
+    "push that 3",
+    "push temp 4",
+    "push static 2",
+    "push pointer 1",
+    "pop local 2",
+    "pop argument 0",
+    "pop that 0",
+    "pop temp 0",
+    "pop static 1",
+    "pop pointer 0",
+    "add",
+    "sub",
+    "neg",
+    "and",
+    "or",
+    "not",
+    "eq",
+    "gt",
+    "lt",
+    "label LOOP",
+    "goto LOOP",
+    "if-goto LOOP",
+    "function Bench.run 3",
+    "call Bench.run 2",
+    "return",
+]
+
+
+def translateIfElif(vm, contents):
+    """
+    The translate loop from before the dispatch tables, kept as a
+    reference. Each line walks an if/elif chain and calls its handler,
+    so arithmetic templates are rebuilt and nothing is cached.
+
+    Inputs:
+
+        vm: VirtualMachine - the translator whose handlers are called.
+        contents: list[str] - a list of the lines of code.
+
+    Returns:
+
+        Returns the translated code in asm.
+    """
+    asm_lines = []
+    for line in contents:
+        line = line.split()
+        if line[0] == "push":
+            asm_lines += vm._push(line[1:])
+        elif line[0] == "pop":
+            asm_lines += vm._pop(line[1:])
+        elif line[0] == "add" or line[0] == "sub":
+            asm_lines += vm._addSub(line[0])
+        elif line[0] == "gt" or line[0] == "lt" or line[0] == "eq":
+            asm_lines += vm._comparisons(line[0])
+        elif line[0] == "neg":
+            asm_lines += vm._neg()
+        elif line[0] == "or":
+            asm_lines += vm._or()
+        elif line[0] == "not":
+            asm_lines += vm._not()
+        elif line[0] == "and":
+            asm_lines += vm._and()
+        elif line[0] == "label":
+            asm_lines += vm._label(line[1])
+        elif line[0] == "if-goto":
+            asm_lines += vm._ifGoto(line[1])
+        elif line[0] == "goto":
+            asm_lines += vm._goto(line[1])
+        elif line[0] == "function":
+            asm_lines += vm._functionDef(line)
+        elif line[0] == "return":
+            asm_lines += vm._return()
+        elif line[0] == "call":
+            asm_lines += vm._call(line)
+    return asm_lines
+
+
+# Ways of translating that are timed: the if/elif reference, then the
+# dispatch tables with the line cache off and on.
+MODES = ("if/elif", "uncached", "cached")
+
+
+def makeTranslator(mode, file=None):
+    """
+    Creates a translator and the function that translates with it.
+
+    Inputs:
+
+        mode: str - one of MODES.
+        file: str - the file name used for static variables.
+
+    Returns:
+
+        Returns (vm, translate) where translate(vm, contents) returns the
+        asm of the lines.
+    """
+    vm = VirtualMachine(file)
+    if mode != "cached":
+        vm.cacheable = set()
+    if mode == "if/elif":
+        return vm, translateIfElif
+    return vm, VirtualMachine.translate
+
+
+def timeCommand(line, mode, repeat=20000):
+    """
+    Times how long it takes to translate a single VM command. Unless mode
+    is "cached", repeated lines are not reused from the translation cache
+    so this measures the cost of translating the command from scratch.
+
+    Inputs:
+
+        line: str - the VM command.
+        mode: str - one of MODES.
+        repeat: int - how many copies of the command to translate.
+
+    Returns:
+
+        Returns the cost of translating the command in microseconds.
+    """
+    vm, translate = makeTranslator(mode, "Bench")
+    contents = [line] * repeat
+    start = time.perf_counter()
+    translate(vm, contents)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def timeFiles(input_path, mode, repeat=20):
+    """
+    Times the translation of every ".vm" file in a directory.
+
+    Inputs:
+
+        input_path: str - a directory with ".vm" files or a ".vm" file.
+        mode: str - one of MODES.
+        repeat: int - how many times to translate the files.
+
+    Returns:
+
+        Returns the number of commands and the cost per command in
+        microseconds.
+    """
+    if os.path.isdir(input_path):
+        paths = [
+            os.path.join(input_path, file_name)
+            for file_name in sorted(os.listdir(input_path))
+            if file_name.endswith(".vm")
+        ]
+    else:
+        paths = [input_path]
+    files = [(path, writeToFile.parseFile(path)) for path in paths]
+    num_commands = sum(len(contents) for _, contents in files) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        vm, translate = makeTranslator(mode)
+        for path, contents in files:
+            vm.set_filepath(path)
+            translate(vm, contents)
+    return num_commands, (time.perf_counter() - start) / num_commands * 1e6
+
+
+def main():
+    """
+    Prints the translation cost of each kind of VM command with the old
+    if/elif loop and with the dispatch tables, without and with the
+    translation cache. If a directory or ".vm" file is given, also prints
+    the cost per command for translating it each way.
+    """
+    print(f"{'command':<24}" + "".join(f" {mode:>11}" for mode in MODES))
+    for line in SAMPLE_COMMANDS:
+        costs = [timeCommand(line, mode) for mode in MODES]
+        print(f"{line:<24}" + "".join(f" {cost:8.3f} us" for cost in costs))
+    if len(sys.argv) > 1:
+        for mode in MODES:
+            num_commands, cost = timeFiles(sys.argv[1], mode)
+            print(f"{sys.argv[1]} ({mode}): {num_commands} commands, {cost:.3f} us/command")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# Execute Hack machine code.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: hackCPU.py
+# Date: 10/18/2026
+
+
+import writeToFile
+import sys
+import time
+from array import array
+
+
+WORD_MASK = 0xFFFF
+
+
+def _generalALU(control):
+    """
+    Creates the ALU function for any combination of the six control bits
+    zx, nx, zy, ny, f and no.
+
+    Inputs:
+
+        control: int - the six comp bits of a C instruction.
+
+    Returns:
+
+        Returns a function of x (D) and y (A or M).
+    """
+    def alu(x, y):
+        if control & 0b100000:
+            x = 0
+        if control & 0b010000:
+            x ^= WORD_MASK
+        if control & 0b001000:
+            y = 0
+        if control & 0b000100:
+            y ^= WORD_MASK
+        out = (x + y) & WORD_MASK if control & 0b000010 else x & y
+        if control & 0b000001:
+            out ^= WORD_MASK
+        return out
+    return alu
+
+
+# ALU function index (the six comp bits) -> function of x (D) and y (A or M).
+# The documented computations get a direct version, every other control
+# combination still computes what the hardware would.
+ALU_FUNCTIONS = [_generalALU(control) for control in range(64)]
+ALU_FUNCTIONS[0b101010] = lambda x, y: 0
+ALU_FUNCTIONS[0b111111] = lambda x, y: 1
+ALU_FUNCTIONS[0b111010] = lambda x, y: WORD_MASK
+ALU_FUNCTIONS[0b001100] = lambda x, y: x
+ALU_FUNCTIONS[0b110000] = lambda x, y: y
+ALU_FUNCTIONS[0b001101] = lambda x, y: x ^ WORD_MASK
+ALU_FUNCTIONS[0b110001] = lambda x, y: y ^ WORD_MASK
+ALU_FUNCTIONS[0b001111] = lambda x, y: -x & WORD_MASK
+ALU_FUNCTIONS[0b110011] = lambda x, y: -y & WORD_MASK
+ALU_FUNCTIONS[0b011111] = lambda x, y: (x + 1) & WORD_MASK
+ALU_FUNCTIONS[0b110111] = lambda x, y: (y + 1) & WORD_MASK
+ALU_FUNCTIONS[0b001110] = lambda x, y: (x - 1) & WORD_MASK
+ALU_FUNCTIONS[0b110010] = lambda x, y: (y - 1) & WORD_MASK
+ALU_FUNCTIONS[0b000010] = lambda x, y: (x + y) & WORD_MASK
+ALU_FUNCTIONS[0b010011] = lambda x, y: (x - y) & WORD_MASK
+ALU_FUNCTIONS[0b000111] = lambda x, y: (y - x) & WORD_MASK
+ALU_FUNCTIONS[0b000000] = lambda x, y: x & y
+ALU_FUNCTIONS[0b010101] = lambda x, y: x | y
+
+
+def decode(instruction):
+    """
+    Decodes a 16-bit instruction.
+
+    Inputs:
+
+        instruction: int - the instruction.
+
+    Returns:
+
+        Returns the value to load into A for an A instruction. For a C
+        instruction returns a tuple of the ALU function, whether y is M,
+        whether the result is stored in M, D and A, and the jump mask.
+    """
+    if instruction < 0x8000:
+        return instruction
+    return (
+        ALU_FUNCTIONS[(instruction >> 6) & 0b111111],
+        bool(instruction & 0x1000),
+        bool(instruction & 0x0008),
+        bool(instruction & 0x0010),
+        bool(instruction & 0x0020),
+        instruction & 0x0007,
+    )
+
+
+class CPU:
+
+
+    # Size of the instruction and data memories in 16-bit words.
+    rom_size = 32768
+    ram_size = 32768
+
+    # Memory mapped I/O.
+    screen_address = 16384
+    keyboard_address = 24576
+
+
+    def __init__(self, program=None):
+        """
+        Initializes the CPU with:
+            rom: [array] - instruction memory.
+            decoded: [list] - every ROM word decoded once by decode.
+            ram: [array] - data memory, including the screen and keyboard.
+            a, d, pc: [int] - the A, D and program counter registers.
+            cycles: [int] - instructions executed since the last reset.
+                Every Hack instruction takes exactly one clock cycle.
+            cycles_per_second: [float] - speed of the last run call.
+            halted: [bool] - whether the last run stopped at a jump to itself.
+        """
+        self.rom = array("H", bytes(2 * self.rom_size))
+        self.decoded = [0] * self.rom_size
+        self.ram = array("H", bytes(2 * self.ram_size))
+        self.program_size = 0
+        self.cycles_per_second = 0.0
+        self.reset()
+        if program is not None:
+            self.loadProgram(program)
+
+
+    def reset(self):
+        """
+        Resets the registers and the cycle counter. Memory is left as is,
+        like pressing the reset button of the Hack computer.
+        """
+        self.a = 0
+        self.d = 0
+        self.pc = 0
+        self.cycles = 0
+        self.halted = False
+        return None
+
+
+    def load(self, input_path):
+        """
+        Loads a ".hack" or ".bin" file produced by the assembler into ROM.
+
+        Inputs:
+
+            input_path: str - path of the program.
+        """
+        self.loadProgram(writeToFile.parseHack(input_path))
+        return None
+
+
+    def loadProgram(self, words):
+        """
+        Loads machine code into ROM, decodes it and resets the CPU.
+
+        Inputs:
+
+            words: list[int] - the 16-bit instructions.
+        """
+        if len(words) > self.rom_size:
+            raise ValueError(f"program has {len(words)} instructions, ROM holds {self.rom_size}")
+        self.rom[:len(words)] = array("H", words)
+        self.rom[len(words):] = array("H", bytes(2 * (self.rom_size - len(words))))
+        self.program_size = len(words)
+        # Programs repeat a small number of distinct words, decode each once.
+        decoded_words = {}
+        for address, word in enumerate(words):
+            op = decoded_words.get(word)
+            if op is None:
+                op = decoded_words[word] = decode(word)
+            self.decoded[address] = op
+        self.decoded[len(words):] = [0] * (self.rom_size - len(words))
+        self.reset()
+        return None
+
+
+    def setKey(self, key_code):
+        """
+        Sets the key currently pressed on the keyboard, 0 for none.
+
+        Inputs:
+
+            key_code: int - the Hack character code of the key.
+        """
+        self.ram[self.keyboard_address] = key_code
+        return None
+
+
+    def step(self):
+        """
+        Executes a single instruction.
+        """
+        # run measures its own speed, one cycle would overwrite the speed
+        # of the last real run.
+        cycles_per_second = self.cycles_per_second
+        self.run(1)
+        self.cycles_per_second = cycles_per_second
+        return None
+
+
+    def run(self, max_cycles):
+        """
+        Executes instructions until max_cycles have run or the program
+        halts by jumping to itself.
+
+        Inputs:
+
+            max_cycles: int - the most instructions to execute.
+
+        Returns:
+
+            Returns the number of cycles executed.
+        """
+        decoded = self.decoded
+        self.halted = False
+        ram = self.ram
+        a = self.a
+        d = self.d
+        pc = self.pc
+        executed = 0
+        start = time.perf_counter()
+        while executed < max_cycles:
+            op = decoded[pc]
+            executed += 1
+            if op.__class__ is int:
+                # A instruction.
+                a = op
+                pc += 1
+                continue
+
+            # C instruction.
+            alu, use_m, store_m, store_d, store_a, jump = op
+            out = alu(d, ram[a & 0x7FFF] if use_m else a)
+
+            # Store the result. M and the jump target use A from before
+            # this instruction changes it.
+            if store_m:
+                ram[a & 0x7FFF] = out
+            if store_d:
+                d = out
+
+            # Jump bits are j1 (out < 0), j2 (out = 0) and j3 (out > 0).
+            if jump and jump & (4 if out & 0x8000 else 2 if out == 0 else 1):
+                new_pc = a & 0x7FFF
+                if store_a:
+                    a = out
+                if jump == 7 and not (store_a or store_d or store_m) and (
+                        new_pc == pc or (new_pc == pc - 1 and decoded[new_pc] == new_pc)):
+                    # An unconditional jump onto itself, alone or as @LOOP,
+                    # 0;JMP, that stores nothing. Nothing can change.
+                    self.halted = True
+                    pc = new_pc
+                    break
+                pc = new_pc
+            else:
+                if store_a:
+                    a = out
+                pc += 1
+        elapsed = time.perf_counter() - start
+        self.a = a
+        self.d = d
+        self.pc = pc
+        self.cycles += executed
+        if elapsed > 0:
+            self.cycles_per_second = executed / elapsed
+        return executed
+
+
+def main():
+    """
+    Handles a user inputed ".hack" or ".bin" file path to run.
+    Pass --cycles=N to set how many cycles to run, 10 million by default.
+    """
+    max_cycles = 10_000_000
+    for arg in sys.argv:
+        if arg.startswith("--cycles="):
+            max_cycles = int(arg[len("--cycles="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: hackCPU.py program.hack [--cycles=N]")
+        sys.exit(1)
+    cpu = CPU()
+    cpu.load(args[1])
+    cycles = cpu.run(max_cycles)
+    state = "halted" if cpu.halted else "stopped"
+    print(f"{state} at pc={cpu.pc} after {cycles} cycles, {cpu.cycles_per_second:,.0f} cycles/s")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+# Execute Hack machine code by compiling basic blocks to Python.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: hackJIT.py
+# Date: 10/18/2026
+
+
+from hackCPU import CPU, ALU_FUNCTIONS
+import sys
+import time
+
+
+# ALU function index -> Python expression of x (D) and y (A or M).
+ALU_EXPRESSIONS = {
+    0b101010: "0",
+    0b111111: "1",
+    0b111010: "65535",
+    0b001100: "{x}",
+    0b110000: "{y}",
+    0b001101: "{x} ^ 65535",
+    0b110001: "{y} ^ 65535",
+    0b001111: "-{x} & 65535",
+    0b110011: "-{y} & 65535",
+    0b011111: "({x} + 1) & 65535",
+    0b110111: "({y} + 1) & 65535",
+    0b001110: "({x} - 1) & 65535",
+    0b110010: "({y} - 1) & 65535",
+    0b000010: "({x} + {y}) & 65535",
+    0b010011: "({x} - {y}) & 65535",
+    0b000111: "({y} - {x}) & 65535",
+    0b000000: "{x} & {y}",
+    0b010101: "{x} | {y}",
+}
+
+# Jump bits -> condition on the result v.
+JUMP_CONDITIONS = {
+    0b001: "0 < v < 32768",
+    0b010: "v == 0",
+    0b011: "v < 32768",
+    0b100: "v >= 32768",
+    0b101: "v != 0",
+    0b110: "v == 0 or v >= 32768",
+}
+
+
+class JITCPU(CPU):
+
+
+    # Longest basic block compiled into one function.
+    max_block_length = 256
+
+
+    def __init__(self, program=None):
+        """
+        Initializes the CPU like hackCPU.CPU, with:
+            blocks: [dict] - entry pc -> (function, number of instructions,
+                pcs after the block that mean the program halted).
+        """
+        self.blocks = {}
+        super().__init__(program)
+
+
+    def loadProgram(self, words):
+        """
+        Loads machine code into ROM and drops the compiled blocks of the
+        previous program.
+
+        Inputs:
+
+            words: list[int] - the 16-bit instructions.
+        """
+        self.blocks = {}
+        super().loadProgram(words)
+        return None
+
+
+    def run(self, max_cycles):
+        """
+        Executes instructions until max_cycles have run or the program
+        halts by jumping to itself. Each basic block is compiled the first
+        time it is entered. When a block would run past max_cycles the
+        remaining instructions are interpreted one at a time, so the cycle
+        count is exact.
+
+        Inputs:
+
+            max_cycles: int - the most instructions to execute.
+
+        Returns:
+
+            Returns the number of cycles executed.
+        """
+        blocks = self.blocks
+        self.halted = False
+        ram = self.ram
+        a = self.a
+        d = self.d
+        pc = self.pc
+        executed = 0
+        start = time.perf_counter()
+        while True:
+            block = blocks.get(pc)
+            if block is None:
+                block = blocks[pc] = self._compileBlock(pc)
+            function, length, halt_targets = block
+            if executed + length > max_cycles:
+                break
+            pc, a, d = function(ram, a, d)
+            executed += length
+            if pc in halt_targets:
+                self.halted = True
+                break
+        self.a = a
+        self.d = d
+        self.pc = pc
+        self.cycles += executed
+        if executed < max_cycles and not self.halted:
+            # Finish the last partial block one instruction at a time.
+            executed += CPU.run(self, max_cycles - executed)
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.cycles_per_second = executed / elapsed
+        return executed
+
+
+    def _compileBlock(self, entry):
+        """
+        Compiles the straight-line code starting at entry into a Python
+        function. The block ends after the first jump instruction or when
+        it reaches the end of the program. Within a block the value of A
+        is tracked at compile time, so "@SP" followed by "M=M+1" becomes
+        ram[0] = (ram[0] + 1) & 65535.
+
+        Inputs:
+
+            entry: int - the address of the first instruction.
+
+        Returns:
+
+            Returns (function, number of instructions, halt targets) where
+            function(ram, a, d) runs the block and returns the new
+            (pc, a, d), and the program halts if the new pc is one of the
+            halt targets.
+        """
+        rom = self.rom
+        end = min(self.program_size, entry + self.max_block_length)
+        body = []
+        # Value of A if it is known at compile time, None if it is in a.
+        a_const = None
+        pc = entry
+        exit_line = None
+        jump = 0
+        a_const_before = None
+        while pc < end or pc == entry:
+            instruction = rom[pc]
+            pc += 1
+            if instruction < 0x8000:
+                a_const = instruction
+                continue
+
+            if a_const is None:
+                address = "a & 32767"
+                y = "a"
+            else:
+                address = str(a_const & 0x7FFF)
+                y = str(a_const)
+            if instruction & 0x1000:
+                y = f"ram[{address}]"
+            control = (instruction >> 6) & 0b111111
+            expression = ALU_EXPRESSIONS.get(control)
+            if expression is None:
+                expression = f"ALU_FUNCTIONS[{control}]({{x}}, {{y}})"
+            expression = expression.format(x="d", y=y)
+
+            store_m = instruction & 0x0008
+            store_d = instruction & 0x0010
+            store_a = instruction & 0x0020
+            jump = instruction & 0x0007
+            if not (store_m or store_d or store_a or jump):
+                continue
+
+            body.append(f"v = {expression}")
+            # The jump target is A from before this instruction.
+            a_const_before = a_const
+            if jump and a_const is None:
+                body.append("t = a & 32767")
+                target = "t"
+            elif jump:
+                target = str(a_const & 0x7FFF)
+            if store_m:
+                body.append(f"ram[{address}] = v")
+            if store_d:
+                body.append("d = v")
+            if store_a:
+                body.append("a = v")
+                a_const = None
+            if jump:
+                final_a = "a" if a_const is None else str(a_const)
+                if jump == 0b111:
+                    exit_line = f"return {target}, {final_a}, d"
+                else:
+                    body.append(f"if {JUMP_CONDITIONS[jump]}:")
+                    body.append(f"    return {target}, {final_a}, d")
+                break
+
+        # Like CPU.run, an unconditional jump that stores nothing halts when
+        # it lands on itself or on the "@LOOP" just before it, since nothing
+        # can change after it.
+        halt_targets = ()
+        if jump == 0b111 and not (store_m or store_d or store_a):
+            jump_address = pc - 1
+            targets = [jump_address]
+            if rom[jump_address - 1] == jump_address - 1:
+                targets.append(jump_address - 1)
+            if a_const_before is not None:
+                targets = [target for target in targets if target == a_const_before & 0x7FFF]
+            halt_targets = tuple(targets)
+        if exit_line is None:
+            final_a = "a" if a_const is None else str(a_const)
+            exit_line = f"return {pc & 0x7FFF}, {final_a}, d"
+        body.append(exit_line)
+        source = "def block(ram, a, d):\n" + "".join(f"    {line}\n" for line in body)
+        namespace = {"ALU_FUNCTIONS": ALU_FUNCTIONS}
+        exec(compile(source, f"<block {entry}>", "exec"), namespace)
+        return namespace["block"], pc - entry, halt_targets
+
+
+def main():
+    """
+    Handles a user inputed ".hack" or ".bin" file path to run.
+    Pass --cycles=N to set how many cycles to run, 10 million by default.
+    """
+    max_cycles = 10_000_000
+    for arg in sys.argv:
+        if arg.startswith("--cycles="):
+            max_cycles = int(arg[len("--cycles="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: hackJIT.py program.hack [--cycles=N]")
+        sys.exit(1)
+    cpu = JITCPU()
+    cpu.load(args[1])
+    cycles = cpu.run(max_cycles)
+    state = "halted" if cpu.halted else "stopped"
+    print(f"{state} at pc={cpu.pc} after {cycles} cycles, {cpu.cycles_per_second:,.0f} cycles/s, "
+          f"{len(cpu.blocks)} blocks compiled")
+    return
+
+
+if __name__ == "__main__":
+    main()
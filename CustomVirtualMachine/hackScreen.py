@@ -0,0 +1,296 @@
+# Observe the memory mapped screen of the Hack computer.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: hackScreen.py
+# Date: 10/18/2026
+
+
+import writeToFile
+from vmInterpreter import VMInterpreter
+from jackOS import JackOS
+import sys
+import os
+import zlib
+import struct
+import hashlib
+
+
+SCREEN_BASE = 16384
+SCREEN_WIDTH = 512
+SCREEN_HEIGHT = 256
+WORDS_PER_ROW = SCREEN_WIDTH // 16
+BYTES_PER_ROW = SCREEN_WIDTH // 8
+
+# The leftmost pixel of a Hack word is its lowest bit, image formats put
+# the leftmost pixel in the highest bit of a byte.
+REVERSED_BITS = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+# PNG stores 0 as black, the Hack screen stores 1 as black.
+INVERTED_BITS = bytes(value ^ 0xFF for value in range(256))
+
+# Braille cells show 2x4 pixels in one terminal character.
+# (column, row) inside the cell -> bit of the braille character.
+BRAILLE_DOTS = (
+    ((0, 0), 0x01), ((0, 1), 0x02), ((0, 2), 0x04), ((1, 0), 0x08),
+    ((1, 1), 0x10), ((1, 2), 0x20), ((0, 3), 0x40), ((1, 3), 0x80),
+)
+BRAILLE_BASE = 0x2800
+CELL_WIDTH = 2
+CELL_HEIGHT = 4
+
+
+class Framebuffer:
+
+
+    def __init__(self, ram, base=SCREEN_BASE):
+        """
+        Initializes a view of the screen memory of a CPU or an interpreter
+        with:
+            ram: [list or array] - the RAM holding the screen.
+            base: [int] - address of the top left word of the screen.
+            shadow: [list or array] - copy of the screen memory as it was
+                at the last update, used to find the rows that changed.
+            packed: [bytearray] - the screen as 1 bit per pixel, 64 bytes
+                per row, leftmost pixel in the highest bit.
+            dirty_rows: [set] - rows changed since the terminal was last
+                drawn.
+            frame_hash: [str] - hash of packed, None when out of date.
+        """
+        self.ram = ram
+        self.base = base
+        self.shadow = None
+        self.packed = bytearray(BYTES_PER_ROW * SCREEN_HEIGHT)
+        self.dirty_rows = set()
+        self.frame_hash = None
+
+
+    def update(self):
+        """
+        Compares the screen memory with the last update and repacks only
+        the rows that changed.
+
+        Returns:
+
+            Returns a sorted list of the rows that changed.
+        """
+        end = self.base + WORDS_PER_ROW * SCREEN_HEIGHT
+        current = self.ram[self.base:end]
+        shadow = self.shadow
+        if shadow is not None and current == shadow:
+            return []
+        changed = []
+        for row in range(SCREEN_HEIGHT):
+            start = row * WORDS_PER_ROW
+            stop = start + WORDS_PER_ROW
+            words = current[start:stop]
+            if shadow is not None and words == shadow[start:stop]:
+                continue
+            changed.append(row)
+            offset = row * BYTES_PER_ROW
+            self.packed[offset:offset + BYTES_PER_ROW] = bytes(
+                byte
+                for word in words
+                for byte in (REVERSED_BITS[word & 0xFF], REVERSED_BITS[word >> 8])
+            )
+        self.shadow = current
+        self.dirty_rows.update(changed)
+        if changed:
+            self.frame_hash = None
+        return changed
+
+
+    def pixel(self, x, y):
+        """
+        Reads a pixel as of the last update.
+
+        Inputs:
+
+            x: int - column from 0 to 511.
+            y: int - row from 0 to 255.
+
+        Returns:
+
+            Returns 1 for black, 0 for white.
+        """
+        byte = self.packed[y * BYTES_PER_ROW + (x >> 3)]
+        return (byte >> (7 - (x & 7))) & 1
+
+
+    def hash(self):
+        """
+        Hashes the screen as of the last update. The hash is only
+        recomputed after a row changes.
+
+        Returns:
+
+            Returns the hex digest of the screen.
+        """
+        if self.frame_hash is None:
+            self.frame_hash = hashlib.blake2b(self.packed, digest_size=16).hexdigest()
+        return self.frame_hash
+
+
+    def toPBM(self):
+        """
+        Encodes the screen as a binary PBM image.
+
+        Returns:
+
+            Returns the bytes of the image.
+        """
+        return f"P4\n{SCREEN_WIDTH} {SCREEN_HEIGHT}\n".encode() + bytes(self.packed)
+
+
+    def toPNG(self):
+        """
+        Encodes the screen as a 1-bit grayscale PNG image.
+
+        Returns:
+
+            Returns the bytes of the image.
+        """
+        inverted = self.packed.translate(INVERTED_BITS)
+        # Every scanline starts with filter type 0.
+        scanlines = b"".join(
+            b"\x00" + inverted[offset:offset + BYTES_PER_ROW]
+            for offset in range(0, len(inverted), BYTES_PER_ROW)
+        )
+        header = struct.pack(">IIBBBBB", SCREEN_WIDTH, SCREEN_HEIGHT, 1, 0, 0, 0, 0)
+        return b"\x89PNG\r\n\x1a\n" + b"".join([
+            _pngChunk(b"IHDR", header),
+            _pngChunk(b"IDAT", zlib.compress(scanlines)),
+            _pngChunk(b"IEND", b""),
+        ])
+
+
+    def writeFrame(self, output_path):
+        """
+        Writes the screen to an image file, PNG if output_path ends with
+        ".png" and PBM otherwise.
+
+        Inputs:
+
+            output_path: str - path of the image.
+        """
+        data = self.toPNG() if output_path.endswith(".png") else self.toPBM()
+        with writeToFile.atomicOpen(output_path, "wb") as output_file:
+            output_file.write(data)
+        return None
+
+
+    def renderTerminal(self, full=False):
+        """
+        Draws the screen with braille characters, one character per 2x4
+        pixels. Only the lines of characters covering rows that changed
+        since the last call are drawn, each moved into place with an ANSI
+        cursor position.
+
+        Inputs:
+
+            full: bool - whether to draw every line.
+
+        Returns:
+
+            Returns the text to write to the terminal.
+        """
+        if full:
+            lines = range(SCREEN_HEIGHT // CELL_HEIGHT)
+        else:
+            lines = sorted({row // CELL_HEIGHT for row in self.dirty_rows})
+        self.dirty_rows = set()
+        output = []
+        for line in lines:
+            output.append(f"\x1b[{line + 1};1H{self._brailleLine(line)}")
+        return "".join(output)
+
+
+    def _brailleLine(self, line):
+        """
+        Converts four rows of pixels to a line of braille characters.
+
+        Inputs:
+
+            line: int - the line of characters.
+
+        Returns:
+
+            Returns the line as a str.
+        """
+        top = line * CELL_HEIGHT
+        characters = []
+        for cell in range(SCREEN_WIDTH // CELL_WIDTH):
+            left = cell * CELL_WIDTH
+            bits = 0
+            for (column, row), bit in BRAILLE_DOTS:
+                if self.pixel(left + column, top + row):
+                    bits |= bit
+            characters.append(chr(BRAILLE_BASE + bits))
+        return "".join(characters)
+
+
+def _pngChunk(kind, data):
+    """
+    Builds a PNG chunk.
+
+    Inputs:
+
+        kind: bytes - the four letter chunk type.
+        data: bytes - the chunk data.
+
+    Returns:
+
+        Returns the chunk with its length and CRC.
+    """
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def main():
+    """
+    Handles a user inputed ".vm" file or directory path to run with the
+    native OS, writing a frame every time the screen changes.
+    Pass --steps=N for how many commands to run (10 million by default),
+    --every=N for how many commands to run between frames (10000 by
+    default) and --out=DIR to write ".pbm" frames, or --png for ".png"
+    frames. Without --out the screen is drawn in the terminal.
+    """
+    max_steps = 10_000_000
+    every = 10_000
+    output_dir = None
+    extension = ".png" if "--png" in sys.argv else ".pbm"
+    for arg in sys.argv:
+        if arg.startswith("--steps="):
+            max_steps = int(arg[len("--steps="):])
+        elif arg.startswith("--every="):
+            every = int(arg[len("--every="):])
+        elif arg.startswith("--out="):
+            output_dir = arg[len("--out="):]
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: hackScreen.py path [--steps=N] [--every=N] [--out=DIR] [--png]")
+        sys.exit(1)
+    interpreter = VMInterpreter()
+    interpreter.load(args[1])
+    JackOS(interpreter).install()
+    framebuffer = Framebuffer(interpreter.ram)
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    else:
+        sys.stdout.write("\x1b[2J")
+    num_frames = 0
+    while interpreter.steps < max_steps and not interpreter.halted:
+        interpreter.run(min(every, max_steps - interpreter.steps))
+        if not framebuffer.update():
+            continue
+        if output_dir is not None:
+            framebuffer.writeFrame(os.path.join(output_dir, f"frame{num_frames:05d}{extension}"))
+        else:
+            sys.stdout.write(framebuffer.renderTerminal())
+            sys.stdout.flush()
+        num_frames += 1
+    print(f"\n{num_frames} frames after {interpreter.steps} commands")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@
 
 
 import writeToFile
+from peepholeOptimizer import PeepholeOptimizer
 import sys
 from pathlib import Path
 import os
@@ -18,22 +19,30 @@ class VirtualMachine:
     # Beginning address of temp
     temp_address = 5
 
+    # Labels of the shared call and return routines used in compact mode.
+    call_routine = "VM$CALL"
+    return_routine = "VM$RETURN"
 
-    def __init__(self, file=None):
+
+    def __init__(self, file=None, compact=False):
         """
         Initializes the virtual machine with:
             var_counter: [int] - Used to create unique variable names.
             file: [str] -  Used to create unique variable names.
             cur_function [str] - Used to define the scope when calling 
                 a function.
+            compact: [bool] - Whether calls and returns jump to the shared
+                routines from _sharedRoutines instead of being inlined.
         """
         self.var_counter = 0
+        self.compact = compact
         if file:
             self.file = file.replace("/", "_")
             self.cur_function = self.file
         else:
             self.file = None
             self.cur_function = None
+        self._buildDispatchTables()
 
 
     def set_filepath(self, file):
@@ -46,6 +55,89 @@ class VirtualMachine:
         """
         self.file = file.replace("/", "_")
         self.cur_function = self.file
+        # Static variables are named after the file.
+        self.translated_lines = {}
+        return None
+
+
+    def _buildDispatchTables(self):
+        """
+        Builds the tables translate and the push/pop commands dispatch on:
+            commands: [dict] - command -> handler taking the split line.
+            cacheable: [set] - commands whose translation depends only on
+                the line and the file, so it can be reused.
+            translated_lines: [dict] - line -> asm for cacheable commands.
+            segment_pointers: [dict] - segment -> register holding its base.
+            pointer_registers: [dict] - pointer index -> THIS or THAT.
+            push_segments, pop_segments: [dict] - segment -> handler.
+            call_save_frame: [list] - asm that pushes the caller's frame.
+        """
+        arithmetic = {
+            "add": self._addSub("add"),
+            "sub": self._addSub("sub"),
+            "neg": self._neg(),
+            "not": self._not(),
+            "and": self._and(),
+            "or": self._or(),
+        }
+        self.commands = {
+            "push": lambda line: self._push(line[1:]),
+            "pop": lambda line: self._pop(line[1:]),
+            "gt": lambda line: self._comparisons(line[0]),
+            "lt": lambda line: self._comparisons(line[0]),
+            "eq": lambda line: self._comparisons(line[0]),
+            "label": lambda line: self._label(line[1]),
+            "if-goto": lambda line: self._ifGoto(line[1]),
+            "goto": lambda line: self._goto(line[1]),
+            "function": self._functionDef,
+            "return": lambda line: self._return(),
+            "call": self._call,
+        }
+        # Arithmetic templates never change so they are built only once.
+        for command, asm_lines in arithmetic.items():
+            self.commands[command] = lambda line, asm_lines=asm_lines: asm_lines
+        self.cacheable = {
+            "push", "pop", "label", "if-goto", "goto", "return"
+        } | arithmetic.keys()
+        self.translated_lines = {}
+        self.segment_pointers = {
+            "local": "@LCL",
+            "argument": "@ARG",
+            "this": "@THIS",
+            "that": "@THAT",
+        }
+        self.pointer_registers = {0: "THIS", 1: "THAT"}
+        # Saving the caller's frame is the same for every call.
+        push_sequence = [
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
+        self.call_save_frame = []
+        for comment, register in [("// push LCL", "@LCL"), ("// push ARG", "@ARG"),
+                                  ("// push this", "@THIS"), ("// push THAT", "@THAT")]:
+            self.call_save_frame += [comment, register] + push_sequence
+        self.push_segments = {
+            "constant": self._pushConstant,
+            "local": self._pushPointerSegment,
+            "argument": self._pushPointerSegment,
+            "this": self._pushPointerSegment,
+            "that": self._pushPointerSegment,
+            "temp": self._pushTemp,
+            "static": self._pushStatic,
+            "pointer": self._pushPointer,
+        }
+        self.pop_segments = {
+            "local": self._popPointerSegment,
+            "argument": self._popPointerSegment,
+            "this": self._popPointerSegment,
+            "that": self._popPointerSegment,
+            "temp": self._popTemp,
+            "static": self._popStatic,
+            "pointer": self._popPointer,
+        }
         return None
 
 
@@ -62,38 +154,22 @@ class VirtualMachine:
             Returns the translated code in asm.
         """
         asm_lines = []#self._call(["call", "Sys.init", "0"])
+        commands = self.commands
+        cacheable = self.cacheable
+        translated_lines = self.translated_lines
 
         # For each code line in contents, get the equivalent asm code.
         for line in contents:
-            line = line.split()
-            if line[0] == "push":
-                asm_lines += self._push(line[1:])
-            elif line[0] == "pop":
-                asm_lines += self._pop(line[1:])
-            elif line[0] == "add" or line[0] == "sub":
-                asm_lines += self._addSub(line[0])
-            elif line[0] == "gt" or line[0] == "lt" or line[0] == "eq":
-                asm_lines += self._comparisons(line[0])
-            elif line[0] == "neg":
-                asm_lines += self._neg()
-            elif line[0] == "or":
-                asm_lines += self._or()
-            elif line[0] == "not":
-                asm_lines += self._not()
-            elif line[0] == "and":
-                asm_lines += self._and()
-            elif line[0] == "label":
-                asm_lines += self._label(line[1])
-            elif line[0] == "if-goto":
-                asm_lines += self._ifGoto(line[1])
-            elif line[0] == "goto":
-                asm_lines += self._goto(line[1])
-            elif line[0] == "function":
-                asm_lines += self._functionDef(line)
-            elif line[0] == "return":
-                asm_lines += self._return()
-            elif line[0] == "call":
-                asm_lines += self._call(line)
+            line_asm = translated_lines.get(line)
+            if line_asm is None:
+                words = line.split()
+                handler = commands.get(words[0])
+                if handler is None:
+                    continue
+                line_asm = handler(words)
+                if words[0] in cacheable:
+                    translated_lines[line] = line_asm
+            asm_lines += line_asm
         return asm_lines
     
 
@@ -129,6 +205,8 @@ class VirtualMachine:
         else:
             num_vars = 0
         return_address = self._createReturnAddress(self.cur_function)
+        if self.compact:
+            return self._compactCall(line, func_name, num_vars, return_address)
         
         # push return address
         asm_lines = [
@@ -142,41 +220,8 @@ class VirtualMachine:
             "M=D"
         ]
 
-        push_sequence = [
-            "D=M",
-            "@SP",
-            "AM=M+1",
-            "A=A-1",
-            "M=D"
-        ]
-
-        # push LCL
-        asm_lines += [
-            "// push LCL",
-            "@LCL"
-        ]
-        asm_lines += push_sequence
-
-        # push ARG
-        asm_lines += [
-            "// push ARG",
-            "@ARG"
-        ]
-        asm_lines += push_sequence
-
-        # push THIS
-        asm_lines += [
-            "// push this",
-            "@THIS"
-        ]
-        asm_lines += push_sequence
-
-        # push THAT
-        asm_lines += [
-            "// push THAT",
-            "@THAT"
-        ]
-        asm_lines += push_sequence
+        # push LCL, ARG, THIS and THAT
+        asm_lines += self.call_save_frame
 
         # ARG = SP - n - 5
         asm_lines += [
@@ -206,6 +251,102 @@ class VirtualMachine:
         return asm_lines
 
 
+    def _compactCall(self, line, func_name, num_vars, return_address):
+        """
+        Translates vm function call to asm that jumps to the shared call
+        routine. The routine gets the function address in R13, the number
+        of arguments plus 5 in R14 and the return address in R15.
+
+        Inputs:
+
+            line: list[str] - line of code defining the function call.
+            func_name: str - the function being called.
+            num_vars: int - the number of arguments.
+            return_address: str - the label to return to.
+
+        Returns:
+
+            Returns the translated function call.
+        """
+        return [
+            f"//   call: {' '.join(line)}",
+            f"@{num_vars + 5}",
+            "D=A",
+            "@R14",
+            "M=D",
+            f"@{func_name}",
+            "D=A",
+            "@R13",
+            "M=D",
+            f"@{return_address}",
+            "D=A",
+            "@R15",
+            "M=D",
+            f"@{self.call_routine}",
+            "0;JMP",
+            f"// return address label: {return_address}",
+            f"({return_address})"
+        ]
+
+
+    def _sharedRoutines(self):
+        """
+        Creates the call and return routines that compact calls and
+        returns jump to. They only need to appear once in a program.
+
+        Returns:
+
+            Returns the asm of the shared call and return routines.
+        """
+        # push return address
+        asm_lines = [
+            "// shared call routine",
+            f"({self.call_routine})",
+            "// push return address",
+            "@R15",
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
+
+        # push LCL, ARG, THIS and THAT
+        asm_lines += self.call_save_frame
+
+        # ARG = SP - n - 5, LCL = SP and goto the function
+        asm_lines += [
+            "// ARG = SP - n - 5",
+            "@R14",
+            "D=M",
+            "@SP",
+            "D=M-D",
+            "@ARG",
+            "M=D",
+            "// LCL = SP",
+            "@SP",
+            "D=M",
+            "@LCL",
+            "M=D",
+            "// goto function",
+            "@R13",
+            "A=M",
+            "0;JMP"
+        ]
+
+        # The return routine is the inlined return.
+        compact = self.compact
+        self.compact = False
+        return_lines = self._return()
+        self.compact = compact
+        asm_lines += [
+            "// shared return routine",
+            f"({self.return_routine})"
+        ]
+        asm_lines += return_lines
+        return asm_lines
+
+
     def _return(self):
         """
         Translates vm return function to asm.
@@ -218,6 +359,12 @@ class VirtualMachine:
 
             Returns the translated return function.
         """
+        if self.compact:
+            return [
+                "//   return",
+                f"@{self.return_routine}",
+                "0;JMP"
+            ]
         asm_lines = ["//   return"]
 
         # FRAME = LCL
@@ -438,54 +585,77 @@ class VirtualMachine:
         """
         segment = line[0]
         address = int(line[1])
-        asm_lines = [f"// pop {segment} {address}"]
-
-        # Set pointer address to THIS or THAT.
-        if segment == "pointer":
-            if address == 0:
-                address = "THIS"
-            elif address == 1:
-                address = "THAT"
-
-        if segment == "argument" or segment == "local" or \
-            segment == "this" or segment == "that":
-            # each of these segments contain a memory address that 
-            # points to the start of their place in memory.
-            if segment == "argument":
-                asm_lines.append("@ARG")
-            elif segment == "local":
-                asm_lines.append("@LCL")
-            elif segment == "this":
-                asm_lines.append("@THIS")
-            elif segment == "that":
-                asm_lines.append("@THAT")
-            # Logic to get to the correct memory location and 
-            # update their value.
-            asm_lines.append("D=M")
-            asm_lines.append(f"@{address}")
-            asm_lines.append("D=D+A")
-            asm_lines.append("@R13")
-
-            asm_lines.append("M=D")
-            asm_lines.append("@SP")
-            asm_lines.append("AM=M-1")
-            asm_lines.append("D=M")
-            asm_lines.append("@R13")
-            asm_lines.append("A=M")
-            asm_lines.append("M=D")
-        elif segment == "temp" or segment == "static" or segment == "pointer":
-            # Each of these segments directly contain their values.
-            if segment == "temp":
-                address += self.temp_address
-            elif segment == "static":
-                address = self._getVarName(address)
-            asm_lines.append("@SP")
-            asm_lines.append("AM=M-1")
-            asm_lines.append("D=M")
-            asm_lines.append(f"@{address}")
-            asm_lines.append("M=D")
+        pop_segment = self.pop_segments.get(segment)
+        if pop_segment is None:
+            return [f"// pop {segment} {address}"]
+        return pop_segment(segment, address)
 
-        return asm_lines
+
+    def _popPointerSegment(self, segment, address):
+        """
+        Pops into argument, local, this or that. Each of these segments
+        contain a memory address that points to the start of their place
+        in memory.
+        """
+        # Logic to get to the correct memory location and 
+        # update their value.
+        return [
+            f"// pop {segment} {address}",
+            self.segment_pointers[segment],
+            "D=M",
+            f"@{address}",
+            "D=D+A",
+            "@R13",
+            "M=D",
+            "@SP",
+            "AM=M-1",
+            "D=M",
+            "@R13",
+            "A=M",
+            "M=D"
+        ]
+
+
+    def _popTemp(self, segment, address):
+        """
+        Pops into temp, which directly contains its values.
+        """
+        return [
+            f"// pop {segment} {address}",
+            "@SP",
+            "AM=M-1",
+            "D=M",
+            f"@{address + self.temp_address}",
+            "M=D"
+        ]
+
+
+    def _popStatic(self, segment, address):
+        """
+        Pops into static, which directly contains its values.
+        """
+        return [
+            f"// pop {segment} {address}",
+            "@SP",
+            "AM=M-1",
+            "D=M",
+            f"@{self._getVarName(address)}",
+            "M=D"
+        ]
+
+
+    def _popPointer(self, segment, address):
+        """
+        Pops into THIS or THAT.
+        """
+        return [
+            f"// pop {segment} {address}",
+            "@SP",
+            "AM=M-1",
+            "D=M",
+            f"@{self.pointer_registers.get(address, address)}",
+            "M=D"
+        ]
 
 
     def _push(self, line):
@@ -500,56 +670,93 @@ class VirtualMachine:
 
             Returns the translated push command in asm.
         """
-        asm_lines = []
         segment = line[0]
         address = int(line[1])
-        asm_lines.append(f"// push {segment} {address}")
+        push_segment = self.push_segments.get(segment)
+        if push_segment is None:
+            return [f"// push {segment} {address}"]
+        return push_segment(segment, address)
 
-        if segment == "constant":
-            # Add the address to the stack.
-            asm_lines.append(f"@{address}")
-            asm_lines.append("D=A")
-            asm_lines.append("@SP")
-            asm_lines.append("A=M")
-            asm_lines.append("M=D")
-            asm_lines.append("@SP")
-            asm_lines.append("M=M+1")
-        else:
-            # For each of these segments, their location in memory must be
-            # found before pushing their value to the stack.
-            if segment == "local" or segment == "that" or \
-                segment == "this" or segment == "argument":
-                # local, that, etc need to have their address dereferenced.
-                if segment == "local":
-                    asm_lines.append("@LCL")
-                elif segment == "that":
-                    asm_lines.append("@THAT")
-                elif segment == "this":
-                    asm_lines.append("@THIS")
-                elif segment == "argument":
-                    asm_lines.append("@ARG")
-                asm_lines.append("D=M")
-                asm_lines.append(f"@{address}")
-                asm_lines.append("A=D+A")
-            # temp, static, etc can have their address computed directly.
-            elif segment == "temp":
-                address += self.temp_address
-                asm_lines.append(f"@{address}")
-            elif segment == "static":
-                address = self._getVarName(address)
-                asm_lines.append(f"@{address}")
-            elif segment == "pointer":
-                if address == 0:
-                    asm_lines.append("@THIS")
-                elif address == 1:
-                    asm_lines.append("@THAT")
-
-            asm_lines.append("D=M")
-            asm_lines.append("@SP")
-            asm_lines.append("AM=M+1")
-            asm_lines.append("A=A-1")
-            asm_lines.append("M=D")
-        
+
+    def _pushConstant(self, segment, address):
+        """
+        Adds the address to the stack.
+        """
+        return [
+            f"// push {segment} {address}",
+            f"@{address}",
+            "D=A",
+            "@SP",
+            "A=M",
+            "M=D",
+            "@SP",
+            "M=M+1"
+        ]
+
+
+    def _pushPointerSegment(self, segment, address):
+        """
+        Pushes from local, that, this or argument, which need to have their
+        address dereferenced.
+        """
+        return [
+            f"// push {segment} {address}",
+            self.segment_pointers[segment],
+            "D=M",
+            f"@{address}",
+            "A=D+A",
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
+
+
+    def _pushTemp(self, segment, address):
+        """
+        Pushes from temp, which can have its address computed directly.
+        """
+        return [
+            f"// push {segment} {address}",
+            f"@{address + self.temp_address}",
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
+
+
+    def _pushStatic(self, segment, address):
+        """
+        Pushes from static, which can have its address computed directly.
+        """
+        return [
+            f"// push {segment} {address}",
+            f"@{self._getVarName(address)}",
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
+
+
+    def _pushPointer(self, segment, address):
+        """
+        Pushes THIS or THAT.
+        """
+        asm_lines = [f"// push {segment} {address}"]
+        if address in self.pointer_registers:
+            asm_lines.append(f"@{self.pointer_registers[address]}")
+        asm_lines += [
+            "D=M",
+            "@SP",
+            "AM=M+1",
+            "A=A-1",
+            "M=D"
+        ]
         return asm_lines
 
     
@@ -740,12 +947,35 @@ class VirtualMachine:
 
 
 
+def _optimize(asm_lines):
+    """
+    Runs the peephole optimizer and reports how many instructions it saved.
+
+    Inputs:
+
+        asm_lines: list[str] - the translated asm.
+
+    Returns:
+
+        Returns the optimized asm.
+    """
+    optimizer = PeepholeOptimizer()
+    optimized = optimizer.optimize(asm_lines)
+    print(f"Peephole optimizer saved {optimizer.saved} instructions")
+    return optimized
+
+
 def main():
     """
     Handles user inputed file paths or folder paths for translating into asm.
     If no path is given, defaults to a pre-assigned path.
+    Pass --optimize to run the peephole optimizer over the translated code
+    and --compact to share one call and one return routine between all
+    call sites.
     """
-    args = sys.argv
+    optimize = "--optimize" in sys.argv
+    compact = "--compact" in sys.argv
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
     default_path = "src/vmAndAsmFiles/SimpleAdd.vm"
     # Determine user inputed file path or default file path.
     if len(args) < 2:
@@ -753,9 +983,11 @@ def main():
         input_path = default_path
     else:
         input_path = args[1]
-    vm = VirtualMachine()
+    vm = VirtualMachine(compact=compact)
     asm_lines = vm._bootstrapCode()
     asm_lines += vm._call(["call", "Sys.init", "0"])
+    if compact:
+        asm_lines += vm._sharedRoutines()
 
     if os.path.isdir(input_path):
         contents = []
@@ -764,19 +996,25 @@ def main():
                 continue
             file_path = os.path.join(input_path, file_name)
             if os.path.isfile(file_path):
-                contents = writeToFile.parseFile(file_path)
+                contents = (line for _, line in writeToFile.streamFile(file_path))
                 vm.set_filepath(file_path)
                 asm_lines += vm.translate(contents)
         output_file = Path(input_path).name + ".asm"
         main_asm_file = os.path.join(input_path, output_file)
+        if optimize:
+            asm_lines = _optimize(asm_lines)
         writeToFile.outToFolder(main_asm_file, asm_lines, change=False)
         print(f"{main_asm_file} created")
     else:
-        contents = writeToFile.parseFile(input_path)
+        contents = (line for _, line in writeToFile.streamFile(input_path))
         # Initialize assembler and translate code.
         file_name = Path(input_path).stem
-        vm = VirtualMachine(file_name)
+        vm = VirtualMachine(file_name, compact=compact)
         asm_lines = vm.translate(contents)
+        if compact:
+            asm_lines += vm._sharedRoutines()
+        if optimize:
+            asm_lines = _optimize(asm_lines)
         writeToFile.outToFolder(input_path, asm_lines)
         print(f"{input_path[:-2]}asm created")
     return
@@ -0,0 +1,903 @@
+# The Jack OS classes implemented in Python for the VM interpreter.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: jackOS.py
+# Date: 10/18/2026
+
+
+from vmInterpreter import VMInterpreter, RETRY, WORD_MASK
+import sys
+from math import isqrt
+
+
+# Memory layout of the Hack platform.
+HEAP_BASE = 2048
+HEAP_END = 16384
+SCREEN_BASE = 16384
+SCREEN_WIDTH = 512
+SCREEN_HEIGHT = 256
+SCREEN_WORDS_PER_ROW = SCREEN_WIDTH // 16
+KEYBOARD_ADDRESS = 24576
+
+# Size of the Output text grid and of a character in pixels.
+OUTPUT_ROWS = 23
+OUTPUT_COLUMNS = 64
+CHARACTER_HEIGHT = 11
+
+# Special character codes.
+NEW_LINE = 128
+BACKSPACE = 129
+DOUBLE_QUOTE = 34
+
+# Bitmaps of the characters drawn by Output, as in the Jack OS Output
+# class: 11 rows of 8 pixels with the leftmost pixel in the lowest bit.
+# Characters without a bitmap are drawn as UNKNOWN_CHARACTER.
+FONT = {
+    32: (0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0),           # space
+    33: (12, 30, 30, 30, 12, 12, 0, 12, 12, 0, 0),   # !
+    34: (54, 54, 20, 0, 0, 0, 0, 0, 0, 0, 0),        # "
+    35: (0, 18, 18, 63, 18, 18, 63, 18, 18, 0, 0),   # #
+    36: (12, 30, 51, 3, 30, 48, 51, 30, 12, 12, 0),  # $
+    37: (0, 0, 35, 51, 24, 12, 6, 51, 49, 0, 0),     # %
+    38: (12, 30, 30, 12, 54, 27, 27, 27, 54, 0, 0),  # &
+    39: (12, 12, 6, 0, 0, 0, 0, 0, 0, 0, 0),         # '
+    40: (24, 12, 6, 6, 6, 6, 6, 12, 24, 0, 0),       # (
+    41: (6, 12, 24, 24, 24, 24, 24, 12, 6, 0, 0),    # )
+    42: (0, 0, 0, 51, 30, 63, 30, 51, 0, 0, 0),      # *
+    43: (0, 0, 0, 12, 12, 63, 12, 12, 0, 0, 0),      # +
+    44: (0, 0, 0, 0, 0, 0, 0, 12, 12, 6, 0),         # ,
+    45: (0, 0, 0, 0, 0, 63, 0, 0, 0, 0, 0),          # -
+    46: (0, 0, 0, 0, 0, 0, 0, 12, 12, 0, 0),         # .
+    47: (0, 0, 32, 48, 24, 12, 6, 3, 1, 0, 0),       # /
+    48: (12, 30, 51, 51, 51, 51, 51, 30, 12, 0, 0),  # 0
+    49: (12, 14, 15, 12, 12, 12, 12, 12, 63, 0, 0),  # 1
+    50: (30, 51, 48, 24, 12, 6, 3, 51, 63, 0, 0),    # 2
+    51: (30, 51, 48, 48, 28, 48, 48, 51, 30, 0, 0),  # 3
+    52: (16, 24, 28, 26, 25, 63, 24, 24, 60, 0, 0),  # 4
+    53: (63, 3, 3, 31, 48, 48, 48, 51, 30, 0, 0),    # 5
+    54: (28, 6, 3, 3, 31, 51, 51, 51, 30, 0, 0),     # 6
+    55: (63, 49, 48, 48, 24, 12, 12, 12, 12, 0, 0),  # 7
+    56: (30, 51, 51, 51, 30, 51, 51, 51, 30, 0, 0),  # 8
+    57: (30, 51, 51, 51, 62, 48, 48, 24, 14, 0, 0),  # 9
+    58: (0, 0, 12, 12, 0, 0, 12, 12, 0, 0, 0),       # :
+    59: (0, 0, 12, 12, 0, 0, 12, 12, 6, 0, 0),       # ;
+    60: (0, 0, 24, 12, 6, 3, 6, 12, 24, 0, 0),       # <
+    61: (0, 0, 0, 63, 0, 0, 63, 0, 0, 0, 0),         # =
+    62: (0, 0, 3, 6, 12, 24, 12, 6, 3, 0, 0),        # >
+    63: (30, 51, 51, 24, 12, 12, 0, 12, 12, 0, 0),   # ?
+    64: (30, 51, 51, 59, 59, 59, 27, 3, 30, 0, 0),   # @
+    65: (12, 30, 51, 51, 63, 51, 51, 51, 51, 0, 0),  # A
+    66: (31, 51, 51, 51, 31, 51, 51, 51, 31, 0, 0),  # B
+    67: (28, 54, 35, 3, 3, 3, 35, 54, 28, 0, 0),     # C
+    68: (15, 27, 51, 51, 51, 51, 51, 27, 15, 0, 0),  # D
+    69: (63, 51, 35, 11, 15, 11, 35, 51, 63, 0, 0),  # E
+    70: (63, 51, 35, 11, 15, 11, 3, 3, 3, 0, 0),     # F
+    71: (28, 54, 35, 3, 59, 51, 51, 54, 44, 0, 0),   # G
+    72: (51, 51, 51, 51, 63, 51, 51, 51, 51, 0, 0),  # H
+    73: (30, 12, 12, 12, 12, 12, 12, 12, 30, 0, 0),  # I
+    74: (60, 24, 24, 24, 24, 24, 27, 27, 14, 0, 0),  # J
+    75: (51, 51, 51, 27, 15, 27, 51, 51, 51, 0, 0),  # K
+    76: (3, 3, 3, 3, 3, 3, 35, 51, 63, 0, 0),        # L
+    77: (33, 51, 63, 63, 51, 51, 51, 51, 51, 0, 0),  # M
+    78: (51, 51, 55, 55, 63, 59, 59, 51, 51, 0, 0),  # N
+    79: (30, 51, 51, 51, 51, 51, 51, 51, 30, 0, 0),  # O
+    80: (31, 51, 51, 51, 31, 3, 3, 3, 3, 0, 0),      # P
+    81: (30, 51, 51, 51, 51, 51, 63, 59, 30, 48, 0), # Q
+    82: (31, 51, 51, 51, 31, 27, 51, 51, 51, 0, 0),  # R
+    83: (30, 51, 51, 6, 28, 48, 51, 51, 30, 0, 0),   # S
+    84: (63, 63, 45, 12, 12, 12, 12, 12, 30, 0, 0),  # T
+    85: (51, 51, 51, 51, 51, 51, 51, 51, 30, 0, 0),  # U
+    86: (51, 51, 51, 51, 51, 30, 30, 12, 12, 0, 0),  # V
+    87: (51, 51, 51, 51, 51, 63, 63, 63, 18, 0, 0),  # W
+    88: (51, 51, 30, 30, 12, 30, 30, 51, 51, 0, 0),  # X
+    89: (51, 51, 51, 51, 30, 12, 12, 12, 30, 0, 0),  # Y
+    90: (63, 51, 49, 24, 12, 6, 35, 51, 63, 0, 0),   # Z
+    91: (30, 6, 6, 6, 6, 6, 6, 6, 30, 0, 0),         # [
+    92: (0, 0, 1, 3, 6, 12, 24, 48, 32, 0, 0),       # backslash
+    93: (30, 24, 24, 24, 24, 24, 24, 24, 30, 0, 0),  # ]
+    94: (8, 28, 54, 0, 0, 0, 0, 0, 0, 0, 0),         # ^
+    95: (0, 0, 0, 0, 0, 0, 0, 0, 0, 63, 0),          # _
+    96: (6, 12, 24, 0, 0, 0, 0, 0, 0, 0, 0),         # `
+    97: (0, 0, 0, 14, 24, 30, 27, 27, 54, 0, 0),     # a
+    98: (3, 3, 3, 15, 27, 51, 51, 51, 30, 0, 0),     # b
+    99: (0, 0, 0, 30, 51, 3, 3, 51, 30, 0, 0),       # c
+    100: (48, 48, 48, 60, 54, 51, 51, 51, 30, 0, 0), # d
+    101: (0, 0, 0, 30, 51, 63, 3, 51, 30, 0, 0),     # e
+    102: (28, 54, 38, 6, 15, 6, 6, 6, 15, 0, 0),     # f
+    103: (0, 0, 30, 51, 51, 51, 62, 48, 51, 30, 0),  # g
+    104: (3, 3, 3, 27, 55, 51, 51, 51, 51, 0, 0),    # h
+    105: (12, 12, 0, 14, 12, 12, 12, 12, 30, 0, 0),  # i
+    106: (48, 48, 0, 56, 48, 48, 48, 48, 51, 30, 0), # j
+    107: (3, 3, 3, 51, 27, 15, 15, 27, 51, 0, 0),    # k
+    108: (14, 12, 12, 12, 12, 12, 12, 12, 30, 0, 0), # l
+    109: (0, 0, 0, 29, 63, 43, 43, 43, 43, 0, 0),    # m
+    110: (0, 0, 0, 29, 51, 51, 51, 51, 51, 0, 0),    # n
+    111: (0, 0, 0, 30, 51, 51, 51, 51, 30, 0, 0),    # o
+    112: (0, 0, 0, 30, 51, 51, 51, 31, 3, 3, 0),     # p
+    113: (0, 0, 0, 30, 51, 51, 51, 62, 48, 48, 0),   # q
+    114: (0, 0, 0, 29, 55, 51, 3, 3, 7, 0, 0),       # r
+    115: (0, 0, 0, 30, 51, 6, 24, 51, 30, 0, 0),     # s
+    116: (4, 6, 6, 15, 6, 6, 6, 54, 28, 0, 0),       # t
+    117: (0, 0, 0, 27, 27, 27, 27, 27, 54, 0, 0),    # u
+    118: (0, 0, 0, 51, 51, 51, 51, 30, 12, 0, 0),    # v
+    119: (0, 0, 0, 51, 51, 51, 63, 63, 18, 0, 0),    # w
+    120: (0, 0, 0, 51, 30, 12, 12, 30, 51, 0, 0),    # x
+    121: (0, 0, 0, 51, 51, 51, 62, 48, 24, 15, 0),   # y
+    122: (0, 0, 0, 63, 27, 12, 6, 51, 63, 0, 0),     # z
+    123: (56, 12, 12, 12, 7, 12, 12, 12, 56, 0, 0),  # {
+    124: (12, 12, 12, 12, 12, 12, 12, 12, 12, 0, 0), # |
+    125: (7, 12, 12, 12, 56, 12, 12, 12, 7, 0, 0),   # }
+    126: (38, 45, 25, 0, 0, 0, 0, 0, 0, 0, 0),       # ~
+}
+UNKNOWN_CHARACTER = (0, 63, 63, 63, 63, 63, 63, 63, 63, 63, 0)
+# Bitmap -> character code, for reading text back from the screen.
+FONT_CODES = {bitmap: code for code, bitmap in FONT.items()}
+
+# Error codes passed to Sys.error, as numbered by the Jack OS.
+ERRORS = {
+    1: "Sys.wait: duration must be positive",
+    2: "Array.new: array size must be positive",
+    3: "Math.divide: division by zero",
+    4: "Math.sqrt: cannot compute square root of a negative number",
+    5: "Memory.alloc: allocated memory size must be positive",
+    6: "Memory.alloc: heap overflow",
+    7: "Screen.drawPixel: illegal pixel coordinates",
+    8: "Screen.drawLine: illegal line coordinates",
+    9: "Screen.drawRectangle: illegal rectangle coordinates",
+    12: "Screen.drawCircle: illegal center coordinates",
+    13: "Screen.drawCircle: illegal radius",
+    14: "String.new: maximum length must be non-negative",
+    15: "String.charAt: string index out of bounds",
+    16: "String.setCharAt: string index out of bounds",
+    17: "String.appendChar: string is full",
+    18: "String.eraseLastChar: string is empty",
+    19: "String.setInt: insufficient string capacity",
+    20: "Output.moveCursor: illegal cursor location",
+}
+
+
+def _signed(value):
+    """
+    Converts a 16-bit word to the signed integer it holds.
+
+    Inputs:
+
+        value: int - the word.
+
+    Returns:
+
+        Returns the value between -32768 and 32767.
+    """
+    return value - 0x10000 if value & 0x8000 else value
+
+
+class JackOS:
+
+
+    def __init__(self, interpreter):
+        """
+        Initializes the OS on the RAM of an interpreter with:
+            interpreter: [VMInterpreter] - the interpreter calling the OS.
+            ram: [list] - the interpreter's RAM. Objects live on the heap
+                and the screen is drawn into RAM at 16384 like on the Hack
+                computer.
+            free_blocks: [list] - sorted (address, size) blocks of the heap
+                that are free.
+            allocations: [dict] - address -> size of every allocated block.
+            color: [bool] - whether Screen draws black.
+            cursor_row, cursor_column: [int] - where Output prints next.
+            wait_ms: [int] - milliseconds requested by Sys.wait. Waiting
+                does not sleep so runs stay fast and deterministic.
+            error_code: [int] - code of the last Sys.error, 0 for none.
+            key_down: [int] - key held during a Keyboard.readChar.
+            line: [list] - characters read so far by Keyboard.readLine.
+        """
+        self.interpreter = interpreter
+        self.ram = interpreter.ram
+        self.error_code = 0
+        self.wait_ms = 0
+        self.init()
+
+
+    def install(self):
+        """
+        Registers every OS function as a native of the interpreter and
+        links the loaded code against them.
+        """
+        self.interpreter.natives.update(self.natives())
+        self.interpreter.link()
+        return None
+
+
+    def natives(self):
+        """
+        Maps the Jack OS function names to their implementations.
+
+        Returns:
+
+            Returns a dict of "Class.function" -> function.
+        """
+        return {
+            "Math.init": lambda: 0,
+            "Math.multiply": self.mathMultiply,
+            "Math.divide": self.mathDivide,
+            "Math.min": self.mathMin,
+            "Math.max": self.mathMax,
+            "Math.abs": self.mathAbs,
+            "Math.sqrt": self.mathSqrt,
+            "Memory.init": self.memoryInit,
+            "Memory.peek": self.memoryPeek,
+            "Memory.poke": self.memoryPoke,
+            "Memory.alloc": self.memoryAlloc,
+            "Memory.deAlloc": self.memoryDeAlloc,
+            "Array.new": self.arrayNew,
+            "Array.dispose": self.memoryDeAlloc,
+            "String.new": self.stringNew,
+            "String.dispose": self.stringDispose,
+            "String.length": self.stringLength,
+            "String.charAt": self.stringCharAt,
+            "String.setCharAt": self.stringSetCharAt,
+            "String.appendChar": self.stringAppendChar,
+            "String.eraseLastChar": self.stringEraseLastChar,
+            "String.intValue": self.stringIntValue,
+            "String.setInt": self.stringSetInt,
+            "String.backSpace": lambda: BACKSPACE,
+            "String.doubleQuote": lambda: DOUBLE_QUOTE,
+            "String.newLine": lambda: NEW_LINE,
+            "Output.init": self.outputInit,
+            "Output.moveCursor": self.outputMoveCursor,
+            "Output.printChar": self.outputPrintChar,
+            "Output.printString": self.outputPrintString,
+            "Output.printInt": self.outputPrintInt,
+            "Output.println": self.outputPrintln,
+            "Output.backSpace": self.outputBackSpace,
+            "Screen.init": self.screenInit,
+            "Screen.clearScreen": self.screenClearScreen,
+            "Screen.setColor": self.screenSetColor,
+            "Screen.drawPixel": self.screenDrawPixel,
+            "Screen.drawLine": self.screenDrawLine,
+            "Screen.drawRectangle": self.screenDrawRectangle,
+            "Screen.drawCircle": self.screenDrawCircle,
+            "Keyboard.init": lambda: 0,
+            "Keyboard.keyPressed": self.keyboardKeyPressed,
+            "Keyboard.readChar": self.keyboardReadChar,
+            "Keyboard.readLine": self.keyboardReadLine,
+            "Keyboard.readInt": self.keyboardReadInt,
+            "Sys.halt": self.sysHalt,
+            "Sys.error": self.sysError,
+            "Sys.wait": self.sysWait,
+        }
+
+
+    def init(self):
+        """
+        Initializes every OS class, like Sys.init does before Main.main.
+        """
+        self.memoryInit()
+        self.screenInit()
+        self.outputInit()
+        self.key_down = 0
+        self.line = None
+        return 0
+
+
+    def _error(self, code):
+        """
+        Stops the program with an error, like Sys.error.
+
+        Inputs:
+
+            code: int - the Jack OS error code.
+        """
+        self.error_code = code
+        self.outputPrintText(f"ERR{code}")
+        self.interpreter.halted = True
+        return 0
+
+
+    # Math
+
+
+    def mathMultiply(self, x, y):
+        # The low 16 bits of the product are the same signed or unsigned.
+        return (x * y) & WORD_MASK
+
+
+    def mathDivide(self, x, y):
+        x = _signed(x)
+        y = _signed(y)
+        if y == 0:
+            return self._error(3)
+        quotient = abs(x) // abs(y)
+        return -quotient if (x < 0) != (y < 0) else quotient
+
+
+    def mathMin(self, x, y):
+        return x if _signed(x) < _signed(y) else y
+
+
+    def mathMax(self, x, y):
+        return x if _signed(x) > _signed(y) else y
+
+
+    def mathAbs(self, x):
+        return abs(_signed(x))
+
+
+    def mathSqrt(self, x):
+        x = _signed(x)
+        if x < 0:
+            return self._error(4)
+        return isqrt(x)
+
+
+    # Memory
+
+
+    def memoryInit(self):
+        """
+        Frees the whole heap.
+        """
+        self.free_blocks = [(HEAP_BASE, HEAP_END - HEAP_BASE)]
+        self.allocations = {}
+        return 0
+
+
+    def memoryPeek(self, address):
+        return self.ram[address & 0x7FFF]
+
+
+    def memoryPoke(self, address, value):
+        self.ram[address & 0x7FFF] = value
+        return 0
+
+
+    def memoryAlloc(self, size):
+        """
+        Allocates a block of the heap with the first free block that fits.
+
+        Inputs:
+
+            size: int - number of words.
+
+        Returns:
+
+            Returns the address of the block.
+        """
+        size = _signed(size)
+        if size <= 0:
+            return self._error(5)
+        free_blocks = self.free_blocks
+        for position, (address, free_size) in enumerate(free_blocks):
+            if free_size < size:
+                continue
+            if free_size == size:
+                del free_blocks[position]
+            else:
+                free_blocks[position] = (address + size, free_size - size)
+            self.allocations[address] = size
+            return address
+        return self._error(6)
+
+
+    def memoryDeAlloc(self, address):
+        """
+        Returns a block to the heap, merging it with the free blocks next
+        to it. Addresses that were not allocated are ignored.
+
+        Inputs:
+
+            address: int - address returned by memoryAlloc.
+        """
+        size = self.allocations.pop(address, None)
+        if size is None:
+            return 0
+        free_blocks = self.free_blocks
+        position = 0
+        while position < len(free_blocks) and free_blocks[position][0] < address:
+            position += 1
+        free_blocks.insert(position, (address, size))
+        # Merge with the next block, then with the previous one.
+        if position + 1 < len(free_blocks):
+            next_address, next_size = free_blocks[position + 1]
+            if address + size == next_address:
+                free_blocks[position] = (address, size + next_size)
+                del free_blocks[position + 1]
+        if position > 0:
+            previous_address, previous_size = free_blocks[position - 1]
+            if previous_address + previous_size == address:
+                free_blocks[position - 1] = (previous_address, previous_size + free_blocks[position][1])
+                del free_blocks[position]
+        return 0
+
+
+    # Array
+
+
+    def arrayNew(self, size):
+        if _signed(size) <= 0:
+            return self._error(2)
+        return self.memoryAlloc(size)
+
+
+    # String. A string object holds its maximum length, its length and
+    # the address of its characters.
+
+
+    def stringNew(self, max_length):
+        max_length = _signed(max_length)
+        if max_length < 0:
+            return self._error(14)
+        string = self.memoryAlloc(3)
+        if self.interpreter.halted:
+            return 0
+        ram = self.ram
+        ram[string] = max_length
+        ram[string + 1] = 0
+        ram[string + 2] = self.memoryAlloc(max(max_length, 1))
+        return string
+
+
+    def stringDispose(self, string):
+        self.memoryDeAlloc(self.ram[string + 2])
+        self.memoryDeAlloc(string)
+        return 0
+
+
+    def stringLength(self, string):
+        return self.ram[string + 1]
+
+
+    def stringCharAt(self, string, index):
+        ram = self.ram
+        if not 0 <= _signed(index) < ram[string + 1]:
+            return self._error(15)
+        return ram[ram[string + 2] + index]
+
+
+    def stringSetCharAt(self, string, index, character):
+        ram = self.ram
+        if not 0 <= _signed(index) < ram[string + 1]:
+            return self._error(16)
+        ram[ram[string + 2] + index] = character
+        return 0
+
+
+    def stringAppendChar(self, string, character):
+        ram = self.ram
+        length = ram[string + 1]
+        if length >= ram[string]:
+            return self._error(17)
+        ram[ram[string + 2] + length] = character
+        ram[string + 1] = length + 1
+        return string
+
+
+    def stringEraseLastChar(self, string):
+        ram = self.ram
+        if ram[string + 1] == 0:
+            return self._error(18)
+        ram[string + 1] -= 1
+        return 0
+
+
+    def stringIntValue(self, string):
+        """
+        Reads the integer at the start of a string, stopping at the first
+        character that is not a digit.
+        """
+        text = self.stringText(string)
+        sign = 1
+        if text.startswith("-"):
+            sign = -1
+            text = text[1:]
+        value = 0
+        for character in text:
+            if not "0" <= character <= "9":
+                break
+            value = value * 10 + ord(character) - ord("0")
+        return (sign * value) & WORD_MASK
+
+
+    def stringSetInt(self, string, value):
+        digits = str(_signed(value))
+        ram = self.ram
+        if len(digits) > ram[string]:
+            return self._error(19)
+        ram[string + 1] = len(digits)
+        characters = ram[string + 2]
+        ram[characters:characters + len(digits)] = [ord(digit) for digit in digits]
+        return 0
+
+
+    def stringText(self, string):
+        """
+        Reads a string object out of RAM.
+
+        Inputs:
+
+            string: int - address of the string object.
+
+        Returns:
+
+            Returns the string as a Python str.
+        """
+        ram = self.ram
+        characters = ram[string + 2]
+        return "".join(map(chr, ram[characters:characters + ram[string + 1]]))
+
+
+    def newString(self, text):
+        """
+        Creates a string object holding text, for calling Jack code.
+
+        Inputs:
+
+            text: str - the characters.
+
+        Returns:
+
+            Returns the address of the string object.
+        """
+        string = self.stringNew(len(text))
+        for character in text:
+            self.stringAppendChar(string, ord(character))
+        return string
+
+
+    # Output. Characters are drawn into the screen memory like the Jack OS
+    # does, two to a word with the even column in the low byte.
+
+
+    def outputInit(self):
+        self.cursor_row = 0
+        self.cursor_column = 0
+        return 0
+
+
+    def outputMoveCursor(self, row, column):
+        row = _signed(row)
+        column = _signed(column)
+        if not (0 <= row < OUTPUT_ROWS and 0 <= column < OUTPUT_COLUMNS):
+            return self._error(20)
+        self.cursor_row = row
+        self.cursor_column = column
+        # The Jack OS erases the character under the moved cursor.
+        self._drawCharacter(FONT[32])
+        return 0
+
+
+    def outputPrintChar(self, character):
+        if character == NEW_LINE:
+            return self.outputPrintln()
+        if character == BACKSPACE:
+            return self.outputBackSpace()
+        self._drawCharacter(FONT.get(character, UNKNOWN_CHARACTER))
+        self.cursor_column += 1
+        if self.cursor_column == OUTPUT_COLUMNS:
+            self.outputPrintln()
+        return 0
+
+
+    def outputPrintString(self, string):
+        self.outputPrintText(self.stringText(string))
+        return 0
+
+
+    def outputPrintInt(self, value):
+        self.outputPrintText(str(_signed(value)))
+        return 0
+
+
+    def outputPrintText(self, text):
+        """
+        Prints a Python str at the cursor.
+
+        Inputs:
+
+            text: str - the characters to print.
+        """
+        for character in text:
+            self.outputPrintChar(ord(character))
+        return None
+
+
+    def outputPrintln(self):
+        self.cursor_column = 0
+        # Like the Jack OS, printing past the last row starts at the top.
+        self.cursor_row = (self.cursor_row + 1) % OUTPUT_ROWS
+        return 0
+
+
+    def outputBackSpace(self):
+        if self.cursor_column > 0:
+            self.cursor_column -= 1
+        elif self.cursor_row > 0:
+            self.cursor_row -= 1
+            self.cursor_column = OUTPUT_COLUMNS - 1
+        self._drawCharacter(FONT[32])
+        return 0
+
+
+    def _cellAddress(self, row, column):
+        """
+        Gets the screen word holding the top of a character cell.
+        """
+        return SCREEN_BASE + row * CHARACTER_HEIGHT * SCREEN_WORDS_PER_ROW + (column >> 1)
+
+
+    def _drawCharacter(self, bitmap):
+        """
+        Draws a character bitmap over the cell at the cursor.
+
+        Inputs:
+
+            bitmap: tuple - the CHARACTER_HEIGHT rows of the character.
+        """
+        ram = self.ram
+        address = self._cellAddress(self.cursor_row, self.cursor_column)
+        if self.cursor_column & 1:
+            for offset, bits in enumerate(bitmap):
+                word_address = address + offset * SCREEN_WORDS_PER_ROW
+                ram[word_address] = (ram[word_address] & 0x00FF) | (bits << 8)
+        else:
+            for offset, bits in enumerate(bitmap):
+                word_address = address + offset * SCREEN_WORDS_PER_ROW
+                ram[word_address] = (ram[word_address] & 0xFF00) | bits
+        return None
+
+
+    def outputLines(self):
+        """
+        Reads the text on the screen back from the screen memory. Cells
+        holding anything but a character, like drawings, read as spaces.
+
+        Returns:
+
+            Returns a list of the rows of text with trailing spaces removed.
+        """
+        ram = self.ram
+        lines = []
+        for row in range(OUTPUT_ROWS):
+            characters = []
+            for column in range(OUTPUT_COLUMNS):
+                address = self._cellAddress(row, column)
+                shift = 8 if column & 1 else 0
+                bitmap = tuple(
+                    (ram[address + offset * SCREEN_WORDS_PER_ROW] >> shift) & 0xFF
+                    for offset in range(CHARACTER_HEIGHT)
+                )
+                characters.append(chr(FONT_CODES.get(bitmap, 32)))
+            lines.append("".join(characters).rstrip())
+        return lines
+
+
+    # Screen. Pixels are drawn straight into the screen memory, 32 words
+    # per row with the leftmost pixel in the lowest bit.
+
+
+    def screenInit(self):
+        self.color = True
+        return 0
+
+
+    def screenClearScreen(self):
+        self.ram[SCREEN_BASE:SCREEN_BASE + SCREEN_HEIGHT * SCREEN_WORDS_PER_ROW] = (
+            [0] * (SCREEN_HEIGHT * SCREEN_WORDS_PER_ROW)
+        )
+        return 0
+
+
+    def screenSetColor(self, color):
+        self.color = color != 0
+        return 0
+
+
+    def screenDrawPixel(self, x, y):
+        x = _signed(x)
+        y = _signed(y)
+        if not (0 <= x < SCREEN_WIDTH and 0 <= y < SCREEN_HEIGHT):
+            return self._error(7)
+        self._fillRows(x, x, y, y)
+        return 0
+
+
+    def screenDrawLine(self, x1, y1, x2, y2):
+        x1, y1, x2, y2 = _signed(x1), _signed(y1), _signed(x2), _signed(y2)
+        if not (0 <= min(x1, x2) and max(x1, x2) < SCREEN_WIDTH and
+                0 <= min(y1, y2) and max(y1, y2) < SCREEN_HEIGHT):
+            return self._error(8)
+        if y1 == y2 or x1 == x2:
+            self._fillRows(min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2))
+            return 0
+        # Bresenham's algorithm for diagonal lines.
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        step_x = 1 if x1 < x2 else -1
+        step_y = 1 if y1 < y2 else -1
+        error = dx + dy
+        while True:
+            self._fillRows(x1, x1, y1, y1)
+            if x1 == x2 and y1 == y2:
+                break
+            twice_error = 2 * error
+            if twice_error >= dy:
+                error += dy
+                x1 += step_x
+            if twice_error <= dx:
+                error += dx
+                y1 += step_y
+        return 0
+
+
+    def screenDrawRectangle(self, x1, y1, x2, y2):
+        x1, y1, x2, y2 = _signed(x1), _signed(y1), _signed(x2), _signed(y2)
+        if not (0 <= x1 <= x2 < SCREEN_WIDTH and 0 <= y1 <= y2 < SCREEN_HEIGHT):
+            return self._error(9)
+        self._fillRows(x1, x2, y1, y2)
+        return 0
+
+
+    def screenDrawCircle(self, x, y, radius):
+        x, y, radius = _signed(x), _signed(y), _signed(radius)
+        if not (0 <= x < SCREEN_WIDTH and 0 <= y < SCREEN_HEIGHT):
+            return self._error(12)
+        if not 0 <= radius <= 181:
+            return self._error(13)
+        # A filled circle is a horizontal line for every row it covers.
+        for dy in range(-radius, radius + 1):
+            row = y + dy
+            if not 0 <= row < SCREEN_HEIGHT:
+                continue
+            half_width = isqrt(radius * radius - dy * dy)
+            left = max(x - half_width, 0)
+            right = min(x + half_width, SCREEN_WIDTH - 1)
+            self._fillRows(left, right, row, row)
+        return 0
+
+
+    def _fillRows(self, x1, x2, y1, y2):
+        """
+        Sets the pixels x1..x2 of the rows y1..y2 to the current color,
+        a whole word at a time.
+
+        Inputs:
+
+            x1, x2: int - the first and last column, x1 <= x2.
+            y1, y2: int - the first and last row, y1 <= y2.
+        """
+        first_word = x1 >> 4
+        last_word = x2 >> 4
+        first_mask = (WORD_MASK << (x1 & 15)) & WORD_MASK
+        last_mask = WORD_MASK >> (15 - (x2 & 15))
+        if first_word == last_word:
+            masks = [first_mask & last_mask]
+        else:
+            masks = [first_mask] + [WORD_MASK] * (last_word - first_word - 1) + [last_mask]
+        ram = self.ram
+        color = self.color
+        for y in range(y1, y2 + 1):
+            address = SCREEN_BASE + y * SCREEN_WORDS_PER_ROW + first_word
+            for offset, mask in enumerate(masks, address):
+                if color:
+                    ram[offset] |= mask
+                else:
+                    ram[offset] &= ~mask & WORD_MASK
+        return None
+
+
+    # Keyboard
+
+
+    def keyboardKeyPressed(self):
+        return self.ram[KEYBOARD_ADDRESS]
+
+
+    def keyboardReadChar(self):
+        """
+        Waits for a key to be pressed and released, then prints it.
+
+        Returns:
+
+            Returns the character code, or RETRY while still waiting.
+        """
+        key = self.ram[KEYBOARD_ADDRESS]
+        if key:
+            self.key_down = key
+            return RETRY
+        if not self.key_down:
+            return RETRY
+        key = self.key_down
+        self.key_down = 0
+        self.outputPrintChar(key)
+        return key
+
+
+    def keyboardReadLine(self, message):
+        """
+        Prints the message, then reads characters until a new line.
+        Backspace erases the last character.
+
+        Returns:
+
+            Returns a new string object, or RETRY while still waiting.
+        """
+        if self.line is None:
+            self.outputPrintString(message)
+            self.line = []
+        key = self.keyboardReadChar()
+        if key is RETRY:
+            return RETRY
+        if key == BACKSPACE:
+            if self.line:
+                self.line.pop()
+            return RETRY
+        if key != NEW_LINE:
+            self.line.append(chr(key))
+            return RETRY
+        text = "".join(self.line)
+        self.line = None
+        return self.newString(text)
+
+
+    def keyboardReadInt(self, message):
+        string = self.keyboardReadLine(message)
+        if string is RETRY:
+            return RETRY
+        value = self.stringIntValue(string)
+        self.stringDispose(string)
+        return value
+
+
+    # Sys
+
+
+    def sysHalt(self):
+        self.interpreter.halted = True
+        return 0
+
+
+    def sysError(self, code):
+        return self._error(_signed(code))
+
+
+    def sysWait(self, duration):
+        duration = _signed(duration)
+        if duration < 0:
+            return self._error(1)
+        self.wait_ms += duration
+        return 0
+
+
+def main():
+    """
+    Handles a user inputed ".vm" file or directory path to run with the
+    OS. Pass --steps=N to set how many commands to run, 10 million by
+    default. Prints the text the program printed when it stops.
+    """
+    max_steps = 10_000_000
+    for arg in sys.argv:
+        if arg.startswith("--steps="):
+            max_steps = int(arg[len("--steps="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: jackOS.py path [--steps=N]")
+        sys.exit(1)
+    interpreter = VMInterpreter()
+    interpreter.load(args[1])
+    jack_os = JackOS(interpreter)
+    jack_os.install()
+    steps = interpreter.run(max_steps)
+    for line in jack_os.outputLines():
+        if line:
+            print(line)
+    state = "halted" if interpreter.halted else "stopped"
+    print(f"{state} after {steps} commands, {interpreter.steps_per_second:,.0f} commands/s")
+    if jack_os.error_code:
+        print(ERRORS.get(jack_os.error_code, f"error {jack_os.error_code}"))
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# Remove redundant instructions from translated VM code.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: peepholeOptimizer.py
+# Date: 10/18/2026
+
+
+# Every push ends by storing D on top of the stack in one of two ways.
+PUSH_D = (
+    ("@SP", "AM=M+1", "A=A-1", "M=D"),
+    ("@SP", "A=M", "M=D", "@SP", "M=M+1"),
+)
+
+# Every pop into a register starts by loading the top of the stack into D.
+POP_D = ("@SP", "AM=M-1", "D=M")
+
+# Constants a C instruction can put straight into D.
+D_CONSTANTS = {"@0": "D=0", "@1": "D=1"}
+
+# (constant, unary op) -> constant the op produces.
+FOLDED_D_CONSTANTS = {
+    ("D=0", "D=-D"): "D=0",
+    ("D=1", "D=-D"): "D=-1",
+    ("D=-1", "D=-D"): "D=1",
+    ("D=0", "D=!D"): "D=-1",
+    ("D=-1", "D=!D"): "D=0",
+}
+
+# (constant in D, add or sub) -> increment of the top of the stack.
+CONSTANT_ARITHMETIC = {
+    ("D=1", "M=D+M"): "M=M+1",
+    ("D=1", "M=M-D"): "M=M-1",
+    ("D=-1", "M=D+M"): "M=M-1",
+    ("D=-1", "M=M-D"): "M=M+1",
+}
+
+
+class PeepholeOptimizer:
+
+
+    def __init__(self):
+        """
+        Initializes the optimizer with:
+            saved: [int] - instructions removed by the last optimize call.
+            out: [list] - the optimized lines being built.
+            code: [list] - indexes into out of the instructions and labels,
+                used to look back over the lines while skipping comments.
+        """
+        self.saved = 0
+        self.out = []
+        self.code = []
+
+
+    def optimize(self, asm_lines):
+        """
+        Rewrites adjacent VM templates into shorter equivalent assembly.
+        Pushes followed by pops cancel out, a pushed value that is only
+        used by the next arithmetic command stays in D, redundant loads of
+        A are dropped and adding or subtracting 1 uses M=M+1 / M=M-1.
+        Rewrites never cross a label, so jump targets are untouched.
+        Comments are kept.
+
+        Inputs:
+
+            asm_lines: list[str] - the output of VirtualMachine.translate.
+
+        Returns:
+
+            Returns the optimized lines. self.saved holds the number of
+            instructions removed.
+        """
+        self.out = []
+        self.code = []
+        for line in asm_lines:
+            self._emit(line)
+        optimized = self._foldConstantArithmetic(self.out)
+        self.saved = self._countInstructions(asm_lines) - self._countInstructions(optimized)
+        return optimized
+
+
+    def _emit(self, line):
+        """
+        Appends a line to the output and rewrites the end of the output
+        until no more rules match.
+
+        Inputs:
+
+            line: str - the line of asm.
+        """
+        out = self.out
+        out.append(line)
+        if line.startswith("//"):
+            return
+        self.code.append(len(out) - 1)
+        replacement = self._matchTail()
+        if replacement is None:
+            return
+        num_matched, new_lines = replacement
+        # Keep the comments between the matched instructions.
+        first = self.code[-num_matched]
+        comments = [old for old in out[first:] if old.startswith("//")]
+        del out[first:]
+        del self.code[-num_matched:]
+        out += comments
+        for new_line in new_lines:
+            self._emit(new_line)
+
+
+    def _tail(self, length):
+        """
+        Gets the last instructions of the output.
+
+        Inputs:
+
+            length: int - how many instructions to get.
+
+        Returns:
+
+            Returns a tuple of the last length instructions, or None if
+            there are not that many.
+        """
+        code = self.code
+        if len(code) < length:
+            return None
+        out = self.out
+        return tuple(out[index] for index in code[-length:])
+
+
+    def _matchTail(self):
+        """
+        Matches the end of the output against the rewrite rules.
+
+        Returns:
+
+            Returns the number of instructions to replace and the lines to
+            replace them with, or None if no rule matches.
+        """
+        last = self.out[self.code[-1]]
+
+        if last == "D=M":
+            # A push followed by a pop leaves the value in D, with A
+            # pointing at the top of the stack.
+            for push in PUSH_D:
+                length = len(push) + len(POP_D)
+                if self._tail(length) == push + POP_D:
+                    return length, ["@SP", "A=M"]
+            # The second @SP of a push is dropped by the reload rule.
+            short_pop = POP_D[1:]
+            push = PUSH_D[1]
+            if self._tail(len(push) + len(short_pop)) == push + short_pop:
+                return len(push) + len(short_pop), ["@SP", "A=M"]
+
+        if last == "A=A-1" and self._tail(3) == ("@SP", "A=M", "A=A-1"):
+            return 3, ["@SP", "A=M-1"]
+
+        if last in ("M=!M", "M=-M"):
+            # Negate a pushed value before pushing it.
+            unary = ("@SP", "A=M-1", last)
+            for push in PUSH_D:
+                for op in (unary, unary[1:]):
+                    if self._tail(len(push) + len(op)) == push + op:
+                        return len(push) + len(op), [f"D={last[2:].replace('M', 'D')}"] + list(push)
+
+        if last in ("D=-D", "D=!D"):
+            tail = self._tail(2)
+            if tail in FOLDED_D_CONSTANTS:
+                return 2, [FOLDED_D_CONSTANTS[tail]]
+
+        if last.startswith("@"):
+            tail = self._tail(3)
+            if tail is not None:
+                first, middle, _ = tail
+                if first.startswith("@"):
+                    if middle.startswith("A=") and ";" not in middle:
+                        # Only A changes and it is overwritten straight away.
+                        return 3, [last]
+                    if middle == "D=A" and first in D_CONSTANTS:
+                        return 3, [D_CONSTANTS[first], last]
+                    if first == last and self._keepsA(middle):
+                        # A still holds the same address.
+                        return 1, []
+            tail = self._tail(2)
+            if tail is not None and tail[0].startswith("@"):
+                return 2, [last]
+
+        return None
+
+
+    def _keepsA(self, line):
+        """
+        Determines whether an instruction leaves A unchanged and does not
+        jump.
+
+        Inputs:
+
+            line: str - the instruction.
+
+        Returns:
+
+            Returns True if A is unchanged.
+        """
+        if line.startswith("@") or line.startswith("(") or ";" in line:
+            return False
+        if "=" not in line:
+            return True
+        return "A" not in line[:line.index("=")]
+
+
+    def _foldConstantArithmetic(self, asm_lines):
+        """
+        Replaces adding or subtracting a pushed 1 or -1 with an increment
+        or decrement of the top of the stack, when the constant in D is not
+        used afterwards.
+
+        Inputs:
+
+            asm_lines: list[str] - the asm lines.
+
+        Returns:
+
+            Returns the rewritten lines.
+        """
+        code = [i for i, line in enumerate(asm_lines) if not line.startswith("//")]
+        removed = set()
+        replaced = {}
+        for position in range(len(code) - 3):
+            indexes = code[position:position + 4]
+            window = [asm_lines[i] for i in indexes]
+            key = (window[0], window[3])
+            if key not in CONSTANT_ARITHMETIC or window[1:3] != ["@SP", "A=M-1"]:
+                continue
+            if indexes[0] in removed or self._isDLive(asm_lines, code, position + 4):
+                continue
+            removed.add(indexes[0])
+            replaced[indexes[3]] = CONSTANT_ARITHMETIC[key]
+        if not removed:
+            return asm_lines
+        return [
+            replaced.get(i, line)
+            for i, line in enumerate(asm_lines)
+            if i not in removed
+        ]
+
+
+    def _isDLive(self, asm_lines, code, position):
+        """
+        Determines whether D may be read before it is written again.
+
+        Inputs:
+
+            asm_lines: list[str] - the asm lines.
+            code: list[int] - indexes of the instructions in asm_lines.
+            position: int - position in code to start looking from.
+
+        Returns:
+
+            Returns False only if D is certainly overwritten before it is
+            read. Labels, jumps and the end of the code count as reads.
+        """
+        for index in code[position:]:
+            line = asm_lines[index]
+            if line.startswith("@"):
+                continue
+            if line.startswith("(") or ";" in line:
+                return True
+            dest, _, comp = line.rpartition("=")
+            if "D" in comp:
+                return True
+            if "D" in dest:
+                return False
+        return True
+
+
+    def _countInstructions(self, asm_lines):
+        """
+        Counts the instructions in asm, leaving out comments and labels.
+
+        Inputs:
+
+            asm_lines: list[str] - the asm lines.
+
+        Returns:
+
+            Returns the number of instructions.
+        """
+        return sum(1 for line in asm_lines if not line.startswith(("//", "(")))
@@ -0,0 +1,200 @@
+# Replay scripted keyboard input into a VM program without a display.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: replayHarness.py
+# Date: 10/18/2026
+
+
+import writeToFile
+from vmInterpreter import VMInterpreter
+from jackOS import JackOS
+from hackScreen import Framebuffer
+import sys
+import time
+
+
+# Key name -> Hack character code of the special keys.
+KEY_CODES = {
+    "NONE": 0,
+    "NEWLINE": 128,
+    "ENTER": 128,
+    "BACKSPACE": 129,
+    "LEFT": 130,
+    "UP": 131,
+    "RIGHT": 132,
+    "DOWN": 133,
+    "HOME": 134,
+    "END": 135,
+    "PAGEUP": 136,
+    "PAGEDOWN": 137,
+    "INSERT": 138,
+    "DELETE": 139,
+    "ESC": 140,
+    "SPACE": 32,
+}
+KEY_CODES.update({f"F{number}": 140 + number for number in range(1, 13)})
+
+
+def parseKeyScript(input_path):
+    """
+    Reads a key script. Every line is "step key": once the program has
+    executed step commands the key is held down until the next line.
+    A key is a number, a single character or a name from KEY_CODES, and
+    NONE releases the keyboard. Comments start with "//".
+
+    Inputs:
+
+        input_path: str - path of the script.
+
+    Returns:
+
+        Returns a list of (step, key code) sorted by step.
+    """
+    events = []
+    for line_number, line in writeToFile.streamFile(input_path):
+        words = line.split()
+        if len(words) != 2 or not words[0].isdigit():
+            raise ValueError(f"{input_path}:{line_number}: expected 'step key', got '{line}'")
+        events.append((int(words[0]), _keyCode(words[1])))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def _keyCode(key):
+    """
+    Converts a key of a key script to its character code.
+
+    Inputs:
+
+        key: str - a number, a single character or a key name.
+
+    Returns:
+
+        Returns the Hack character code.
+    """
+    if key.isdigit():
+        return int(key)
+    if key.upper() in KEY_CODES:
+        return KEY_CODES[key.upper()]
+    if len(key) == 1:
+        return ord(key)
+    raise ValueError(f"unknown key {key}")
+
+
+class ReplayHarness:
+
+
+    def __init__(self, input_path, events, frame_every=20000):
+        """
+        Loads a ".vm" file or directory with the native OS and
+        initializes the harness with:
+            interpreter: [VMInterpreter] - runs the program.
+            jack_os: [JackOS] - the OS the program calls.
+            framebuffer: [Framebuffer] - view of the screen memory.
+            events: [list] - (step, key code) to feed through KBD.
+            frame_every: [int] - commands executed between screen checks.
+            trace: [list] - (step, screen hash) for every check where the
+                screen changed.
+        """
+        self.interpreter = VMInterpreter()
+        self.interpreter.load(input_path)
+        self.jack_os = JackOS(self.interpreter)
+        self.jack_os.install()
+        self.framebuffer = Framebuffer(self.interpreter.ram)
+        self.events = events
+        self.frame_every = frame_every
+        self.trace = []
+
+
+    def run(self, max_steps):
+        """
+        Runs the program until max_steps commands have executed or it
+        halts, pressing the scripted keys at their steps. The screen is
+        checked every frame_every commands, so the trace only depends on
+        the program and the script.
+
+        Inputs:
+
+            max_steps: int - the most commands to execute.
+
+        Returns:
+
+            Returns the trace.
+        """
+        interpreter = self.interpreter
+        events = self.events
+        next_event = 0
+        next_frame = self.frame_every
+        while interpreter.steps < max_steps and not interpreter.halted:
+            while next_event < len(events) and events[next_event][0] <= interpreter.steps:
+                interpreter.setKey(events[next_event][1])
+                next_event += 1
+            stop = min(next_frame, max_steps)
+            if next_event < len(events):
+                stop = min(stop, events[next_event][0])
+            interpreter.run(stop - interpreter.steps)
+            if interpreter.steps < next_frame and not interpreter.halted and interpreter.steps < max_steps:
+                continue
+            next_frame = interpreter.steps + self.frame_every
+            if self.framebuffer.update():
+                self.trace.append((interpreter.steps, self.framebuffer.hash()))
+        return self.trace
+
+
+def main():
+    """
+    Handles a user inputed ".vm" file or directory path and key script
+    path to replay, printing "step screen_hash" whenever the screen
+    changes.
+    Pass --steps=N for how many commands to run (5 million by default),
+    --every=N for how many commands run between screen checks (20000 by
+    default), --out=PATH to write the trace to a file instead and
+    --check=PATH to compare the trace with one written before, exiting
+    with status 1 if they differ.
+    """
+    max_steps = 5_000_000
+    frame_every = 20000
+    output_path = None
+    check_path = None
+    for arg in sys.argv:
+        if arg.startswith("--steps="):
+            max_steps = int(arg[len("--steps="):])
+        elif arg.startswith("--every="):
+            frame_every = int(arg[len("--every="):])
+        elif arg.startswith("--out="):
+            output_path = arg[len("--out="):]
+        elif arg.startswith("--check="):
+            check_path = arg[len("--check="):]
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 3:
+        print("Usage: replayHarness.py path keys [--steps=N] [--every=N] [--out=PATH] [--check=PATH]")
+        sys.exit(1)
+    harness = ReplayHarness(args[1], parseKeyScript(args[2]), frame_every)
+    start = time.perf_counter()
+    trace = harness.run(max_steps)
+    elapsed = time.perf_counter() - start
+    lines = [f"{step} {screen_hash}" for step, screen_hash in trace]
+    if output_path is not None:
+        writeToFile.writeLines(output_path, lines)
+    elif check_path is None:
+        print("\n".join(lines))
+    steps = harness.interpreter.steps
+    state = "halted" if harness.interpreter.halted else "stopped"
+    print(f"{state} after {steps} commands, {len(trace)} frames, "
+          f"{elapsed:.2f}s ({steps / elapsed:,.0f} commands/s)")
+    if check_path is not None:
+        expected = writeToFile.parseFile(check_path)
+        if expected != lines:
+            mismatch = next(
+                (index for index, pair in enumerate(zip(expected, lines)) if pair[0] != pair[1]),
+                min(len(expected), len(lines)),
+            )
+            print(f"trace differs from {check_path} at frame {mismatch}")
+            sys.exit(1)
+        print(f"trace matches {check_path}")
+    return
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+# Execute VM code directly without translating it to assembly.
+#
+# Author: Kevin Corbett
+# Version: 1.0
+# File Name: vmInterpreter.py
+# Date: 10/18/2026
+
+
+import writeToFile
+import sys
+import os
+import time
+
+
+# Opcodes of the predecoded commands. Every command is a tuple
+# (opcode, x, y) where x and y depend on the opcode.
+(
+    PUSH_CONSTANT,  # x = value
+    PUSH_SEGMENT,   # x = register holding the base, y = index
+    PUSH_ADDRESS,   # x = RAM address (temp, pointer and static)
+    POP_SEGMENT,    # x = register holding the base, y = index
+    POP_ADDRESS,    # x = RAM address
+    ADD,
+    SUB,
+    NEG,
+    AND,
+    OR,
+    NOT,
+    EQ,
+    GT,
+    LT,
+    GOTO,           # x = target
+    IF_GOTO,        # x = target
+    FUNCTION,       # x = number of local variables
+    CALL,           # x = target, y = number of arguments
+    CALL_NATIVE,    # x = Python function, y = number of arguments
+    CALL_UNDEFINED, # x = function name, y = number of arguments
+    RETURN,
+    HALT,
+) = range(22)
+
+# Segment -> register holding its base address.
+SEGMENT_REGISTERS = {"local": 1, "argument": 2, "this": 3, "that": 4}
+
+# Segment -> first RAM address of the fixed segments.
+FIXED_SEGMENTS = {"temp": 5, "pointer": 3}
+
+ARITHMETIC_OPCODES = {
+    "add": ADD,
+    "sub": SUB,
+    "neg": NEG,
+    "and": AND,
+    "or": OR,
+    "not": NOT,
+    "eq": EQ,
+    "gt": GT,
+    "lt": LT,
+}
+
+WORD_MASK = 0xFFFF
+
+# Returned by a native function that cannot finish yet.
+RETRY = object()
+
+
+class VMInterpreter:
+
+
+    # Memory layout of the Hack platform.
+    ram_size = 32768
+    static_address = 16
+    stack_address = 256
+    keyboard_address = 24576
+
+    # Functions the program starts in, the first one defined is used.
+    entry_functions = ("Sys.init", "Main.main")
+
+
+    def __init__(self, natives=None):
+        """
+        Initializes the interpreter with:
+            ram: [list] - data memory laid out like the Hack RAM, so SP,
+                LCL, ARG, THIS and THAT live in RAM[0..4] and the stack
+                starts at 256.
+            natives: [dict] - function name -> Python function called with
+                the arguments instead of VM code. Functions defined in the
+                loaded VM code take precedence. A native returns the value
+                of the call, or RETRY to be called again on the next step.
+            code: [list] - the predecoded commands of every loaded file,
+                followed by a HALT that the entry function returns to.
+            functions: [dict] - function name -> index of its first command.
+            call_names: [dict] - index of a call -> name of the function.
+            statics: [dict] - "File.index" -> RAM address.
+            pc: [int] - index of the next command.
+            steps: [int] - commands executed since the last reset.
+            steps_per_second: [float] - speed of the last run call.
+            halted: [bool] - whether the program has finished.
+        """
+        self.ram = [0] * self.ram_size
+        self.natives = {} if natives is None else natives
+        self.code = [(HALT, 0, 0)]
+        self.functions = {}
+        self.call_names = {}
+        self.statics = {}
+        self.pc = 0
+        self.steps = 0
+        self.steps_per_second = 0.0
+        self.halted = False
+
+
+    def load(self, input_path):
+        """
+        Loads a ".vm" file or every ".vm" file in a directory and resets
+        the interpreter.
+
+        Inputs:
+
+            input_path: str - path of the file or directory.
+        """
+        if os.path.isdir(input_path):
+            paths = [
+                os.path.join(input_path, file_name)
+                for file_name in sorted(os.listdir(input_path))
+                if file_name.endswith(".vm")
+            ]
+        else:
+            paths = [input_path]
+        files = [
+            (os.path.splitext(os.path.basename(path))[0], writeToFile.parseFile(path))
+            for path in paths
+        ]
+        self.loadFiles(files)
+        return None
+
+
+    def loadFiles(self, files):
+        """
+        Predecodes VM code and resets the interpreter.
+
+        Inputs:
+
+            files: list[tuple] - (file name, list of cleaned lines) pairs.
+                The file name without its extension scopes the static
+                variables and labels of the file.
+        """
+        self.code = []
+        self.functions = {}
+        self.call_names = {}
+        self.statics = {}
+        for file_name, lines in files:
+            self.code += self._decodeFile(file_name, lines, len(self.code))
+        self.code.append((HALT, 0, 0))
+        self.link()
+        self.reset()
+        return None
+
+
+    def link(self):
+        """
+        Resolves every call to the index of the function or to its native
+        implementation. Call again after changing natives.
+        """
+        functions = self.functions
+        natives = self.natives
+        for index, name in self.call_names.items():
+            y = self.code[index][2]
+            if name in functions:
+                self.code[index] = (CALL, functions[name], y)
+            elif name in natives:
+                self.code[index] = (CALL_NATIVE, natives[name], y)
+            else:
+                self.code[index] = (CALL_UNDEFINED, name, y)
+        return None
+
+
+    def reset(self):
+        """
+        Resets the stack and calls the entry function with no arguments,
+        like the bootstrap code of the translator. Code without functions
+        runs from its first command. Memory outside the stack is left as is.
+        """
+        ram = self.ram
+        self.steps = 0
+        self.halted = False
+        entry = next((name for name in self.entry_functions if name in self.functions), None)
+        if entry is None:
+            ram[0] = self.stack_address
+            self.pc = 0
+            return None
+        # The entry function returns to the HALT at the end of the code.
+        sp = self.stack_address
+        ram[sp] = len(self.code) - 1
+        ram[sp + 1:sp + 5] = ram[1:5]
+        sp += 5
+        ram[0] = sp
+        ram[1] = sp
+        ram[2] = sp - 5
+        self.pc = self.functions[entry]
+        return None
+
+
+    def setKey(self, key_code):
+        """
+        Sets the key currently pressed on the keyboard, 0 for none.
+
+        Inputs:
+
+            key_code: int - the Hack character code of the key.
+        """
+        self.ram[self.keyboard_address] = key_code
+        return None
+
+
+    def _decodeFile(self, file_name, lines, base):
+        """
+        Predecodes the commands of a single file.
+
+        Inputs:
+
+            file_name: str - the file name used for statics and labels.
+            lines: list[str] - the cleaned lines of the file.
+            base: int - index of the first command of the file in code.
+
+        Returns:
+
+            Returns the list of decoded commands.
+        """
+        code = []
+        labels = {}
+        jumps = []
+        for line in lines:
+            words = line.split()
+            command = words[0]
+            if command == "push" or command == "pop":
+                segment = words[1]
+                index = int(words[2])
+                if segment == "constant":
+                    code.append((PUSH_CONSTANT, index & WORD_MASK, 0))
+                    continue
+                if segment in SEGMENT_REGISTERS:
+                    opcode = PUSH_SEGMENT if command == "push" else POP_SEGMENT
+                    code.append((opcode, SEGMENT_REGISTERS[segment], index))
+                    continue
+                if segment == "static":
+                    address = self._staticAddress(f"{file_name}.{index}")
+                elif segment in FIXED_SEGMENTS:
+                    address = FIXED_SEGMENTS[segment] + index
+                else:
+                    raise ValueError(f"{file_name}: unknown segment in '{line}'")
+                opcode = PUSH_ADDRESS if command == "push" else POP_ADDRESS
+                code.append((opcode, address, 0))
+            elif command in ARITHMETIC_OPCODES:
+                code.append((ARITHMETIC_OPCODES[command], 0, 0))
+            elif command == "label":
+                labels[words[1]] = base + len(code)
+            elif command == "goto" or command == "if-goto":
+                jumps.append((len(code), words[1]))
+                code.append((GOTO if command == "goto" else IF_GOTO, None, 0))
+            elif command == "function":
+                self.functions[words[1]] = base + len(code)
+                num_vars = int(words[2]) if len(words) > 2 else 0
+                code.append((FUNCTION, num_vars, 0))
+            elif command == "call":
+                self.call_names[base + len(code)] = words[1]
+                code.append((CALL_UNDEFINED, words[1], int(words[2])))
+            elif command == "return":
+                code.append((RETURN, 0, 0))
+
+        # Labels can be used before they are defined.
+        for index, label in jumps:
+            if label not in labels:
+                raise ValueError(f"{file_name}: undefined label {label}")
+            code[index] = (code[index][0], labels[label], 0)
+        return code
+
+
+    def _staticAddress(self, name):
+        """
+        Gets the RAM address of a static variable, allocating the next one
+        the first time it is used like the assembler does for variables.
+
+        Inputs:
+
+            name: str - the static in the form File.index.
+
+        Returns:
+
+            Returns the address of the static.
+        """
+        address = self.statics.get(name)
+        if address is None:
+            address = self.static_address + len(self.statics)
+            if address >= self.stack_address:
+                raise ValueError(f"too many static variables, {name} does not fit")
+            self.statics[name] = address
+        return address
+
+
+    def run(self, max_steps):
+        """
+        Executes commands until max_steps have run or the program halts.
+        The program halts when the entry function returns, when code
+        without functions runs off its end, when a goto jumps to itself or
+        when a native sets halted.
+
+        Inputs:
+
+            max_steps: int - the most commands to execute.
+
+        Returns:
+
+            Returns the number of commands executed.
+        """
+        code = self.code
+        ram = self.ram
+        pc = self.pc
+        sp = ram[0]
+        executed = 0
+        start = time.perf_counter()
+        while executed < max_steps:
+            opcode, x, y = code[pc]
+            pc += 1
+            executed += 1
+            if opcode == PUSH_CONSTANT:
+                ram[sp] = x
+                sp += 1
+            elif opcode == PUSH_SEGMENT:
+                ram[sp] = ram[ram[x] + y]
+                sp += 1
+            elif opcode == POP_SEGMENT:
+                sp -= 1
+                ram[ram[x] + y] = ram[sp]
+            elif opcode == PUSH_ADDRESS:
+                ram[sp] = ram[x]
+                sp += 1
+            elif opcode == POP_ADDRESS:
+                sp -= 1
+                ram[x] = ram[sp]
+            elif opcode == ADD:
+                sp -= 1
+                ram[sp - 1] = (ram[sp - 1] + ram[sp]) & WORD_MASK
+            elif opcode == SUB:
+                sp -= 1
+                ram[sp - 1] = (ram[sp - 1] - ram[sp]) & WORD_MASK
+            elif opcode == IF_GOTO:
+                sp -= 1
+                if ram[sp]:
+                    pc = x
+            elif opcode == GOTO:
+                if x == pc - 1:
+                    # Jumping onto itself, nothing can change.
+                    pc = x
+                    self.halted = True
+                    break
+                pc = x
+            elif opcode == NOT:
+                ram[sp - 1] ^= WORD_MASK
+            elif opcode == EQ:
+                sp -= 1
+                ram[sp - 1] = WORD_MASK if ram[sp - 1] == ram[sp] else 0
+            elif opcode == GT:
+                # Like the translated D=M-D;JGT, this tests the sign of the
+                # 16-bit difference, which is flipped when it overflows.
+                sp -= 1
+                difference = (ram[sp - 1] - ram[sp]) & WORD_MASK
+                ram[sp - 1] = WORD_MASK if difference and not difference & 0x8000 else 0
+            elif opcode == LT:
+                sp -= 1
+                ram[sp - 1] = WORD_MASK if (ram[sp - 1] - ram[sp]) & 0x8000 else 0
+            elif opcode == AND:
+                sp -= 1
+                ram[sp - 1] &= ram[sp]
+            elif opcode == OR:
+                sp -= 1
+                ram[sp - 1] |= ram[sp]
+            elif opcode == NEG:
+                ram[sp - 1] = -ram[sp - 1] & WORD_MASK
+            elif opcode == CALL:
+                # Save the caller's frame, then jump to the function.
+                ram[sp] = pc
+                ram[sp + 1:sp + 5] = ram[1:5]
+                sp += 5
+                ram[2] = sp - 5 - y
+                ram[1] = sp
+                pc = x
+            elif opcode == FUNCTION:
+                if x:
+                    ram[sp:sp + x] = [0] * x
+                    sp += x
+            elif opcode == RETURN:
+                frame = ram[1]
+                arg = ram[2]
+                pc = ram[frame - 5]
+                ram[arg] = ram[sp - 1]
+                sp = arg + 1
+                ram[1:5] = ram[frame - 4:frame]
+            elif opcode == CALL_NATIVE:
+                sp -= y
+                ram[0] = sp
+                self.pc = pc
+                result = x(*ram[sp:sp + y])
+                if result is RETRY:
+                    # The native is waiting, for example for a key press.
+                    # Call it again, like a busy loop would.
+                    sp += y
+                    pc -= 1
+                    continue
+                ram[sp] = 0 if result is None else result & WORD_MASK
+                sp += 1
+                if self.halted:
+                    break
+            elif opcode == HALT:
+                pc -= 1
+                self.halted = True
+                break
+            else:
+                raise ValueError(f"call to undefined function {x}")
+        ram[0] = sp
+        self.pc = pc
+        self.steps += executed
+        elapsed = time.perf_counter() - start
+        if elapsed > 0:
+            self.steps_per_second = executed / elapsed
+        return executed
+
+
+def main():
+    """
+    Handles a user inputed ".vm" file or directory path to run.
+    Pass --steps=N to set how many commands to run, 10 million by default.
+    """
+    max_steps = 10_000_000
+    for arg in sys.argv:
+        if arg.startswith("--steps="):
+            max_steps = int(arg[len("--steps="):])
+    args = [arg for arg in sys.argv if not arg.startswith("--")]
+    if len(args) < 2:
+        print("Usage: vmInterpreter.py path [--steps=N]")
+        sys.exit(1)
+    interpreter = VMInterpreter()
+    interpreter.load(args[1])
+    steps = interpreter.run(max_steps)
+    state = "halted" if interpreter.halted else "stopped"
+    print(f"{state} after {steps} commands, {interpreter.steps_per_second:,.0f} commands/s")
+    return
+
+
+if __name__ == "__main__":
+    main()
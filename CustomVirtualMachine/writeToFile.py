@@ -7,6 +7,16 @@
 
 
 from pathlib import Path
+import os
+import sys
+from array import array
+from contextlib import contextmanager
+from itertools import islice
+
+
+# Size of the write buffer used for output files.
+BUFFER_SIZE = 1 << 16
+
 
 def parseFile(input_path):
     """
@@ -21,19 +31,53 @@ def parseFile(input_path):
         Creates a list of the contents of the input_path with 
         the leading white space and comments removed.
     """
-    input_file_contents = []
     # Open file and clean its contents.
+    return [line for _, line in streamFile(input_path)]
+
+
+def streamFile(input_path):
+    """
+    Takes in a user inputed file path and lazily
+    yields the lines in the file striped of leading white space and
+    comments. Only one line of the file is held in memory at a time.
+
+    Input:
+        input_path [str] - A file path
+
+    Output:
+        Yields (line_number, line) pairs where line_number is the 1-based
+        line of the file the cleaned line came from.
+    """
     with open(input_path, 'r') as file:
-        lines = file.readlines()
-        input_file_contents = cleanLines(lines)
-    
-    # Check if there is a new line at the end of the file and remove it.
-    last_line = input_file_contents[-1]
-    input_file_contents[-1] = last_line.rstrip('\n')
+        yield from iterCleanLines(file)
+
+
+def parseHack(input_path):
+    """
+    Takes in a user inputed file path to a program produced by the
+    assembler and reads its machine code. ".bin" files hold packed
+    little-endian 16-bit words, any other file is read as the textual
+    ".hack" format with one 16 character binary word per line.
+
+    Input:
+        input_path [str] - A file path with the extension .hack or .bin
 
-    # Write updated content to the output path.
-    #input_file_contents = ''.join(input_file_contents)
-    return input_file_contents
+    Output:
+        Creates an array of the 16-bit instructions in the file.
+    """
+    words = array("H")
+    if Path(input_path).suffix == ".bin":
+        with open(input_path, "rb") as file:
+            words.frombytes(file.read())
+        if sys.byteorder != "little":
+            words.byteswap()
+        return words
+    with open(input_path, "r") as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                words.append(int(line, 2))
+    return words
 
 
 def outToFolder(output_path, contents, change=True):
@@ -43,7 +87,7 @@ def outToFolder(output_path, contents, change=True):
 
     Input:
         output_path [str] - A file path with the extension 
-        contents [list] - List of the contents to output to the file
+        contents [iterable] - Lines of the contents to output to the file
         change [bool] - Whether to output the contents without changing the
             output_path extension.
 
@@ -60,9 +104,61 @@ def outToFolder(output_path, contents, change=True):
         output_path = output_path[:-4] + ".hack"
     elif output_path_suffix == ".vm":
         output_path = output_path[:-3] + ".asm"
-    output_file = open(output_path, "w")
-    contents = '\n'.join(contents)
-    output_file.write(contents)
+    writeLines(output_path, contents)
+
+
+def writeLines(output_path, lines, chunk_size=1024):
+    """
+    Writes lines of text to output_path separated by new lines. The lines
+    are written a chunk at a time through a buffered file so the whole
+    output is never joined into one string. See atomicOpen.
+
+    Input:
+        output_path [str] - The file path to write
+        lines [iterable] - The lines to write, e.g. a generator
+        chunk_size [int] - Number of lines joined per write
+
+    Output:
+        Creates or replaces the file at output_path
+    """
+    lines = iter(lines)
+    with atomicOpen(output_path, "w") as output_file:
+        first_line = next(lines, None)
+        if first_line is None:
+            return
+        output_file.write(first_line)
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                break
+            output_file.write("\n")
+            output_file.write("\n".join(chunk))
+
+
+@contextmanager
+def atomicOpen(output_path, mode="w"):
+    """
+    Opens a temporary file next to output_path and renames it to
+    output_path once the block finishes. If anything fails the temporary
+    file is removed and output_path is left as it was, so a crashed build
+    never leaves a half-written file.
+
+    Input:
+        output_path [str] - The file path to write
+        mode [str] - "w" for text or "wb" for binary
+
+    Output:
+        Yields the open temporary file
+    """
+    temp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, mode, buffering=BUFFER_SIZE) as output_file:
+            yield output_file
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
 
 
 def cleanLines(lines):
@@ -77,55 +173,47 @@ def cleanLines(lines):
 
         Returns code with out whitespace or comments.
     """
-    clean_lines = []
-
-    i = 0
-    # Loop through each line of code and remove comments and whitespace.
-    while i < len(lines):
-        line = lines[i]
-        line = cleanFileLine(line)
-
-
-        comment_index = line.find("//")
-        if comment_index != -1:
-            line = line[:comment_index]
-        line = cleanFileLine(line)
+    return [line for _, line in iterCleanLines(lines)]
 
-        # Remove multiline comment if it is on a single line.
-        # E.g. code... /* ... comments ... */
-        if "/*" in line and "*/" in line:
-            begin_index = line.index("/*")
-            end_index = line.index("*/")
-            begin_line = line[0:begin_index]
-            end_line = line[end_index+2:]
-            line = begin_line + end_line
 
-        line = cleanFileLine(line)
+def iterCleanLines(lines):
+    """
+    Removes comments and whitespace from lines of code one line at a time.
+    Handles "//" comments as well as "/* ... */" comments that start and
+    end on the same line or span several lines.
 
-        if line is None or line == "":
-            i += 1
-            continue
+    Inputs:
 
-        if not line.startswith("/*"):
-            clean_lines.append(line) 
+        lines: iterable[str] - the lines of code, e.g. an open file.
 
-        # Remove lines of code if it is in a multiline comment.
-        if "/*" in line:
-            comment_index = line.index("/*")
-            line = line[:comment_index]
-            line = cleanFileLine(line)
-            cleanFileLine(line)
-            i += 1
-            while "*/" not in lines[i] and i < len(lines):
-                i += 1 
-            
-        i += 1
-    return clean_lines
-                
+    Returns:
 
-def cleanFileLine(line):
+        Yields (line_number, line) pairs for every line that still has
+        code once comments and whitespace are removed. Line numbers start
+        at 1 and refer to the original lines.
     """
-    Removes whitespace and new lines from a line of code.
+    in_comment = False
+    for line_number, line in enumerate(lines, 1):
+        if in_comment:
+            # Skip lines until the multiline comment is closed.
+            end_index = line.find("*/")
+            if end_index == -1:
+                continue
+            line = line[end_index+2:]
+            in_comment = False
+
+        # Most lines have no comments at all.
+        if "/" in line:
+            line, in_comment = _removeComments(line)
+
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def _removeComments(line):
+    """
+    Removes the comments from a single line of code.
 
     Inputs:
 
@@ -133,9 +221,18 @@ def cleanFileLine(line):
 
     Returns:
 
-        Returns line of code with whitespace and newlines removed.
+        Returns the line without comments and whether it opens a
+        multiline comment that is not closed on this line.
     """
-
-    line = line.strip()
-    line = line.replace("/n", "")
-    return line
\ No newline at end of file
+    while True:
+        line_comment = line.find("//")
+        block_comment = line.find("/*")
+        if block_comment == -1 or (line_comment != -1 and line_comment < block_comment):
+            if line_comment != -1:
+                line = line[:line_comment]
+            return line, False
+        end_index = line.find("*/", block_comment+2)
+        if end_index == -1:
+            return line[:block_comment], True
+        # E.g. code... /* ... comments ... */ code...
+        line = line[:block_comment] + " " + line[end_index+2:]
\ No newline at end of file